@@ -6,8 +6,12 @@ import time
 import threading
 import subprocess
 import csv
+import queue
+import re
+import mmap
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -22,6 +26,11 @@ try:
 except ImportError:
     openpyxl = None
 
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
 # ---------------- Theme (exact reference palette) ----------------
 # Matches the sidebar, background, and accents in the provided image. [attached_image:1]
 LIGHT_UI = {
@@ -191,27 +200,103 @@ def open_path(p):
     except Exception as e:
         messagebox.showerror("Open failed", str(e))  # [file:3]
 
-def iter_files(root, extensions=None):
+# Directory names never descended into: VCS metadata, dependencies, caches, build output.
+# Default for the "Skip Dirs" field, which can override it per search.
+SKIP_DIRS = frozenset({".git", "node_modules", ".venv", "venv", "__pycache__", ".idea", ".mypy_cache", "dist", "build"})
+
+def iter_files(root, extensions=None, skip_dirs=SKIP_DIRS):
     if not extensions or "All" in extensions:
         exts = None
     else:
-        exts = set(e.lower() for e in extensions)
-    for dirpath, _, filenames in os.walk(root):
-        for fn in filenames:
-            if exts:
-                lf = fn.lower()
-                if not any(lf.endswith(e) for e in exts):
-                    continue
-            yield os.path.join(dirpath, fn)  # [file:3]
+        exts = tuple({e.lower() for e in extensions})  # str.endswith checks a tuple in one C call
+    # os.scandir DirEntry type checks reuse the readdir data instead of an extra
+    # stat per entry; an explicit stack keeps deep trees off the Python call stack
+    stack = [root]
+    while stack:
+        subdirs = []
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        # like os.walk, don't descend into linked dirs
+                        if not entry.is_symlink() and entry.name not in skip_dirs:
+                            subdirs.append(entry.path)
+                    elif not exts or entry.name.lower().endswith(exts):
+                        yield entry.path  # [file:3]
+        except OSError:
+            continue
+        stack.extend(reversed(subdirs))  # visit subdirs in listing order, as os.walk does
+
+MMAP_THRESHOLD = 256 * 1024  # larger files are checked for the keyword in place before decoding
 
-def read_text_lines(path):
+def read_text(path, must_match=None):
+    # One read() of the whole file: fewer syscalls than line-by-line reading.
+    # With a bytes pattern, the raw bytes are searched first and "" is returned
+    # without decoding when it isn't there; files over MMAP_THRESHOLD are
+    # searched through mmap (a C-level scan of the page cache) before being read.
     try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.readlines()
+        with open(path, "rb") as f:
+            if must_match is not None and os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if not must_match.search(mm):
+                        return ""
+                must_match = None  # already found
+            data = f.read()
     except Exception:
-        return []  # [file:3]
+        return ""  # [file:3]
+    if must_match is not None and not must_match.search(data):
+        return ""
+    text = data.decode("utf-8", errors="ignore")
+    # universal newlines, as a text-mode read would give
+    return text.replace("\r\n", "\n").replace("\r", "\n") if "\r" in text else text
+
+def split_text_lines(text):
+    # Lines without their "\n"; read_text has already turned \r\n and \r
+    # into \n, so these are the lines a text-mode readlines() would give
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()  # text ended with a newline
+    return lines
 
 # ---------------- Worker and search ----------------
+def compile_matcher(text, exactmatch, pertoken, casesensitive):
+    # One compiled pattern per match mode. Case-insensitive matching compares
+    # lowercased text, as str.lower() does; re.IGNORECASE saves the lowercased
+    # copy but folds more beyond ASCII (e.g. "ſ" matches "s"), so it is only
+    # used when both the text and the keyword are ASCII.
+    def build(kw, flags):
+        if exactmatch:
+            return re.compile(re.escape(kw), flags).fullmatch
+        if pertoken:
+            return re.compile(rf"(?<!\S){re.escape(kw)}(?!\S)", flags).search
+        return re.compile(re.escape(kw), flags).search
+
+    if casesensitive:
+        return build(text, 0)
+    lowered = build(text.lower(), 0)
+    if not text.isascii():
+        return lambda s: lowered(s.lower())
+    folded = build(text, re.IGNORECASE)
+    return lambda s: folded(s) if s.isascii() else lowered(s.lower())
+
+# Non-ASCII letters that re.IGNORECASE matches to an ASCII one in str patterns;
+# this covers the two ("İ", "K") whose str.lower() contains an ASCII letter
+_FOLD_EXTRAS = {"i": ("\u0130", "\u0131"), "k": ("\u212a",), "s": ("\u017f",)}
+
+def compile_bytes_prefilter(keyword, casesensitive):
+    # Bytes pattern finding every spot of the UTF-8 file where the str pattern
+    # from compile_matcher(keyword, False, False, ...) could match; None when
+    # the keyword isn't ASCII and no such pattern is built.
+    if not keyword.isascii():
+        return None
+    if casesensitive:
+        return re.compile(re.escape(keyword.encode()))
+    parts = []
+    for ch in keyword:
+        alts = [re.escape(ch.encode())] + [re.escape(x.encode()) for x in _FOLD_EXTRAS.get(ch.lower(), ())]
+        parts.append(alts[0] if len(alts) == 1 else b"(?:" + b"|".join(alts) + b")")
+    return re.compile(b"".join(parts), re.IGNORECASE)
+
 def worker_search_file(
     fpath, primarykeyword, subscan_enabled, contextkw,
     bufferbefore, bufferafter, bufferboth,
@@ -219,35 +304,32 @@ def worker_search_file(
 ):
     if stopevent.is_set():
         return []
-    lines = read_text_lines(fpath)
+    text = read_text(fpath, compile_bytes_prefilter(primarykeyword, casesensitive))
     results = []
 
-    def norm(s): return s if casesensitive else s.lower()
-    key = norm(primarykeyword)
-    ctx = norm(contextkw) if contextkw else None
+    # Every match mode needs the keyword somewhere in the line, so one C-level
+    # search over the whole text rejects files that can't match before any
+    # per-line work
+    if not compile_matcher(primarykeyword, False, False, casesensitive)(text):
+        return results
+    lines = split_text_lines(text)
+
+    key_match = compile_matcher(primarykeyword, exactmatch, pertoken, casesensitive)
+    ctx_match = compile_matcher(contextkw, exactmatch, pertoken, casesensitive) if contextkw else None
 
-    def is_comment_line_text(hay):
-        t = hay.lstrip()
+    def is_comment_line_text(text):
+        t = text.lstrip()
         return (t.startswith("//") or t.startswith("#") or t.startswith("--")
                 or t.startswith("/*") or t.startswith("*") or t.startswith("*/"))
 
-    for idx, raw in enumerate(lines, start=1):
+    for idx, line in enumerate(lines, start=1):
         if stopevent.is_set():
             break
-        line = raw.rstrip("\n")
-        hay = norm(line)
 
-        if ignorecomments == "Yes" and is_comment_line_text(hay):
+        if ignorecomments == "Yes" and is_comment_line_text(line):
             continue
 
-        if exactmatch:
-            found = hay == key
-        elif pertoken:
-            found = key in hay.split()
-        else:
-            found = key in hay
-
-        if not found:
+        if not key_match(line):
             continue
 
         codeblock = ""
@@ -260,8 +342,7 @@ def worker_search_file(
             taken_before = 0
             while j >= 0 and taken_before < before_n:
                 line_j = lines[j]
-                hay_j = norm(line_j)
-                if not (ignorecomments == "Yes" and is_comment_line_text(hay_j)):
+                if not (ignorecomments == "Yes" and is_comment_line_text(line_j)):
                     window_lines.insert(0, line_j)
                     taken_before += 1
                 j -= 1
@@ -272,25 +353,14 @@ def worker_search_file(
             taken_after = 0
             while k < len(lines) and taken_after < after_n:
                 line_k = lines[k]
-                hay_k = norm(line_k)
-                if not (ignorecomments == "Yes" and is_comment_line_text(hay_k)):
+                if not (ignorecomments == "Yes" and is_comment_line_text(line_k)):
                     window_lines.append(line_k)
                     taken_after += 1
                 k += 1
 
-            window = "".join(window_lines)
-            window_proc = norm(window)
+            window = "\n".join(window_lines)
 
-            context_found = True
-            if ctx:
-                if exactmatch:
-                    context_found = window_proc.strip() == ctx
-                elif pertoken:
-                    context_found = ctx in window_proc.split()
-                else:
-                    context_found = ctx in window_proc
-
-            if not context_found:
+            if ctx_match and not ctx_match(window.strip() if exactmatch else window):
                 continue
 
             codeblock = window.rstrip()
@@ -299,13 +369,30 @@ def worker_search_file(
 
     return results  # [file:3]
 
+SCAN_CHUNK_SIZE = 64  # files per task sent to a worker process
+
+def _scan_chunk(paths, options):
+    # Runs in a worker process, so matching isn't limited by the GIL. The UI's
+    # threading.Event can't cross the process boundary: the chunk gets a local
+    # one and cancellation is applied between chunks by the parent.
+    stop = threading.Event()
+    file_matches = []
+    for fpath in paths:
+        try:
+            matches = worker_search_file(fpath, *options, stop)
+        except Exception:
+            matches = []
+        file_matches.append((fpath, matches))
+    return file_matches
+
 def search_in_files_parallel(
     folder, primarykeyword, extensions, exact, pertoken, case,
     ignorecomments, safeguard, currentfile_var, progresssetter, progressproxy,
     foundtext_var, filesproxy, totalfiles_var,
     subscan_enabled=False, contextkeyword="", bufferbefore=2, bufferafter=2, bufferboth=True, stopevent=None,
+    skip_dirs=SKIP_DIRS,
 ):
-    filelist = list(iter_files(folder, extensions))
+    filelist = list(iter_files(folder, extensions, skip_dirs))
     total = len(filelist)
     scanned = 0
     files_with_match = 0
@@ -316,7 +403,7 @@ def search_in_files_parallel(
     except Exception:
         pass
 
-    maxworkers = max(2, min(32, (os.cpu_count() or 4)))
+    maxworkers = max(2, min(32, (os.cpu_count() or 4)))  # worker processes
     last_update = time.time()
 
     def throttled_progress(frac):
@@ -333,65 +420,54 @@ def search_in_files_parallel(
         throttled_progress(0.0)
 
     shared_stop = stopevent or threading.Event()
-    with ThreadPoolExecutor(max_workers=maxworkers) as exe:
-        future_map = {
-            exe.submit(
-                worker_search_file,
-                fpath,
-                primarykeyword,
-                subscan_enabled,
-                contextkeyword,
-                bufferbefore,
-                bufferafter,
-                bufferboth,
-                exact,
-                pertoken,
-                case,
-                ignorecomments,
-                shared_stop,
-            ): fpath
-            for fpath in filelist
-        }
+    options = (primarykeyword, subscan_enabled, contextkeyword, bufferbefore, bufferafter, bufferboth,
+               exact, pertoken, case, ignorecomments)
+    chunks = [filelist[i:i + SCAN_CHUNK_SIZE] for i in range(0, total, SCAN_CHUNK_SIZE)]
+    limit_reached = False
+    with ProcessPoolExecutor(max_workers=maxworkers) as exe:
+        future_map = {exe.submit(_scan_chunk, chunk, options): chunk for chunk in chunks}
 
         for fut in as_completed(future_map):
-            fpath = future_map[fut]
-
             if shared_stop.is_set():
-                try:
-                    _ = fut.result(timeout=0)
-                except Exception:
-                    pass
-                continue
+                # chunks already running finish in their process; queued ones are dropped
+                exe.shutdown(wait=False, cancel_futures=True)
+                break
 
             try:
-                matches = fut.result()
+                file_matches = fut.result()
             except Exception:
-                matches = []
-
-            if matches:
-                results.extend(matches)
-                files_with_match += 1
-
-            scanned += 1
-            now = time.time()
-            if now - last_update >= 0.20 or scanned == total:
-                last_update = now
-                frac = scanned / total if total else 1.0
-                try:
-                    currentfile_var.set(fpath)
-                except Exception:
-                    pass
-                try:
-                    filesproxy.set(f"Scanned {scanned}/{total}")
-                except Exception:
-                    pass
-                try:
-                    foundtext_var.set(f"Files with matches {files_with_match}")
-                except Exception:
-                    pass
-                throttled_progress(frac)
-
-            if safeguard and safeguard > 0 and scanned >= safeguard:
+                file_matches = [(fpath, []) for fpath in future_map[fut]]
+
+            for fpath, matches in file_matches:
+                if matches:
+                    results.extend(matches)
+                    files_with_match += 1
+
+                scanned += 1
+                now = time.time()
+                if now - last_update >= 0.20 or scanned == total:
+                    last_update = now
+                    frac = scanned / total if total else 1.0
+                    try:
+                        currentfile_var.set(fpath)
+                    except Exception:
+                        pass
+                    try:
+                        filesproxy.set(f"Scanned {scanned}/{total}")
+                    except Exception:
+                        pass
+                    try:
+                        foundtext_var.set(f"Files with matches {files_with_match}")
+                    except Exception:
+                        pass
+                    throttled_progress(frac)
+
+                if safeguard and safeguard > 0 and scanned >= safeguard:
+                    limit_reached = True
+                    break
+
+            if limit_reached:
+                exe.shutdown(wait=False, cancel_futures=True)
                 break
 
     try:
@@ -422,6 +498,7 @@ class RepoSearchApp(ctk.CTk):
         # State
         self.stopevent = threading.Event()
         self.searchresults = []
+        self.ui_queue = queue.Queue()  # worker threads post UI work here; drained on the Tk loop
         self.history = load_history()
         self.auto_summary = tk.BooleanVar(value=True)
 
@@ -443,6 +520,7 @@ class RepoSearchApp(ctk.CTk):
         # Build UI
         self._build_sidebar()
         self._build_main()
+        self.after(50, self._drain_ui_queue)
     # Theme, dialogs, navigation
     def apply_theme(self):
         p = theme.palette
@@ -540,7 +618,27 @@ class RepoSearchApp(ctk.CTk):
                 self.current_file_text.set(currentfile)
             if totalfiles is not None:
                 self.total_files_text.set(f"Total Files {totalfiles}")
-        self.after(1, apply)
+        self.ui_queue.put(("call", apply))
+
+    def _drain_ui_queue(self, batch=500):
+        # Only the Tk main loop touches widgets: apply up to 'batch' queued
+        # updates per tick, then check again in 50 ms.
+        try:
+            for _ in range(batch):
+                kind, *args = self.ui_queue.get_nowait()
+                if kind == "row":
+                    self.tree.insert("", "end", values=args[0])
+                elif kind == "progress":
+                    self.progress_bar.set(args[0])
+                    self.progress_text.set(f"{args[0]*100:0.1f}")
+                elif kind == "var":
+                    args[0].set(args[1])
+                elif kind == "call":
+                    args[0]()
+        except queue.Empty:
+            pass
+        finally:
+            self.after(50, self._drain_ui_queue)
 
     def start_search_thread(self):
         keyword = self.keyword_entry.get().strip()
@@ -578,6 +676,7 @@ class RepoSearchApp(ctk.CTk):
         pertoken = bool(self.token_var.get())
         case = bool(self.case_var.get())
         ignorecomments = self.ignore_cb.get()
+        skip_dirs = frozenset(d.strip() for d in self.skip_dirs_entry.get().split(",") if d.strip())
 
         subscan_enabled = bool(self.subscan_var.get())
         context = self.context_var.get().strip()
@@ -604,12 +703,9 @@ class RepoSearchApp(ctk.CTk):
         self.found_chip.configure(text="Found 0")
 
         def progresssetter(frac):
-            try:
-                self.progress_bar.set(frac)
-                self.progress_text.set(f"{frac*100:0.1f}")
-            except Exception:
-                pass
+            self.ui_queue.put(("progress", frac))
 
+        found_files_text = tk.StringVar()
         start_ts = time.time()
 
         def run():
@@ -622,24 +718,25 @@ class RepoSearchApp(ctk.CTk):
                 case,
                 ignorecomments,
                 safeguard,
-                self.current_file_text,
+                QueuedVar(self.ui_queue, self.current_file_text),
                 progresssetter,
-                VarProxy(self, self.progress_text),
-                tk.StringVar(),
-                VarProxy(self, self.files_scanned_text),
-                self.total_files_text,
+                QueuedVar(self.ui_queue, self.progress_text),
+                QueuedVar(self.ui_queue, found_files_text),
+                QueuedVar(self.ui_queue, self.files_scanned_text),
+                QueuedVar(self.ui_queue, self.total_files_text),
                 subscan_enabled=subscan_enabled,
                 contextkeyword=context,
                 bufferbefore=bufferbefore,
                 bufferafter=bufferafter,
                 bufferboth=bufferboth,
                 stopevent=self.stopevent,
+                skip_dirs=skip_dirs,
             )
 
             duration = time.time() - start_ts
             self.searchresults = results
             for idx, (fp, ln, txt, codeblock) in enumerate(results, start=1):
-                self.tree.insert("", "end", values=(idx, fp, ln, txt))
+                self.ui_queue.put(("row", (idx, fp, ln, txt)))
 
             self._safe_ui_update(
                 progress=1.0,
@@ -675,12 +772,14 @@ class RepoSearchApp(ctk.CTk):
             hist["scans"].insert(0, entry)
             hist["scans"] = hist["scans"][:MAX_HISTORY]
             save_history(hist)
-            self.history = hist
-            self.refresh_summary_tree()
 
-            if self.auto_summary.get():
-                self.show_summary()
-                self.update_donut_for_index(0)
+            def finish():
+                self.history = hist
+                self.refresh_summary_tree()
+                if self.auto_summary.get():
+                    self.show_summary()
+                    self.update_donut_for_index(0)
+            self.ui_queue.put(("call", finish))
 
         threading.Thread(target=run, daemon=True).start()
 
@@ -852,6 +951,13 @@ class RepoSearchApp(ctk.CTk):
         self.safeguard_entry.insert(0, "0")
         self.safeguard_entry.grid(row=0, column=6, padx=6, pady=6, sticky="w")
 
+        ctk.CTkLabel(opts, text="Skip Dirs", text_color=p["text"], font=FONT_STACK_BOLD)\
+            .grid(row=1, column=0, padx=8, pady=6, sticky="w")
+        self.skip_dirs_entry = ctk.CTkEntry(opts, width=520, placeholder_text=".git,node_modules")
+        style_entry(self.skip_dirs_entry)
+        self.skip_dirs_entry.insert(0, ",".join(sorted(SKIP_DIRS)))
+        self.skip_dirs_entry.grid(row=1, column=1, columnspan=6, padx=6, pady=6, sticky="w")
+
         actions = ctk.CTkFrame(parent, corner_radius=16, fg_color=p["surface"])
         actions.pack(fill="x", padx=8, pady=(0, 8))
         actions.grid_columnconfigure(0, weight=1)
@@ -1301,11 +1407,10 @@ class RepoSearchApp(ctk.CTk):
 
         try:
             rows = self.prepare_export_rows(dedupe_by_filename=dedupe)
-            with open(out, "w", encoding="utf-8", newline="") as f:
+            with open(out, "w", encoding="utf-8", newline="", buffering=1024 * 1024) as f:
                 w = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
                 w.writerow(["Index", "File Path", "Line Number", "Line Content", "Code Block"])
-                for r in rows:
-                    w.writerow(r)
+                w.writerows(rows)
             messagebox.showinfo("Exported", f"CSV exported:\n{out}")
 
             hist = load_history()
@@ -1321,8 +1426,8 @@ class RepoSearchApp(ctk.CTk):
         if not self.searchresults:
             messagebox.showwarning("No Results", "No results to export.")
             return
-        if openpyxl is None:
-            messagebox.showerror("Export error", "openpyxl is not installed. Install with: pip install openpyxl")
+        if xlsxwriter is None and openpyxl is None:
+            messagebox.showerror("Export error", "No Excel writer installed. Install with: pip install xlsxwriter")
             return
 
         resp = messagebox.askyesnocancel(
@@ -1345,18 +1450,38 @@ class RepoSearchApp(ctk.CTk):
 
         try:
             rows = self.prepare_export_rows(dedupe_by_filename=dedupe)
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Results"
-            ws.append(["Index", "File Path", "Line Number", "Line Content", "Code Block"])
-            for r in rows:
-                ws.append([r[0], sanitize_excel(r[1]), sanitize_excel(r[2]), sanitize_excel(r[3]), sanitize_excel(r[4])])
-
-            ws2 = wb.create_sheet("Summary")
-            for row in self.prepare_summary_rows():
-                ws2.append([sanitize_excel(c) for c in row])
-
-            wb.save(out)
+            header = ["Index", "File Path", "Line Number", "Line Content", "Code Block"]
+            if xlsxwriter is not None:
+                # constant_memory writes each row out as soon as the next one
+                # starts (rows must go top to bottom, one sheet after the other);
+                # cell text is stored as-is, never as a formula or link
+                wb = xlsxwriter.Workbook(out, {
+                    "constant_memory": True,
+                    "strings_to_formulas": False,
+                    "strings_to_urls": False,
+                    "strings_to_numbers": False,
+                })
+                ws = wb.add_worksheet("Results")
+                ws.write_row(0, 0, header)
+                for i, r in enumerate(rows, start=1):
+                    ws.write_row(i, 0, (r[0], sanitize_excel(r[1]), sanitize_excel(r[2]), sanitize_excel(r[3]), sanitize_excel(r[4])))
+                ws2 = wb.add_worksheet("Summary")
+                for i, row in enumerate(self.prepare_summary_rows()):
+                    ws2.write_row(i, 0, [sanitize_excel(c) for c in row])
+                wb.close()
+            else:
+                # write_only streams each appended row instead of keeping a Cell object per value
+                wb = openpyxl.Workbook(write_only=True)
+                ws = wb.create_sheet("Results")
+                ws.append(header)
+                for r in rows:
+                    ws.append([r[0], sanitize_excel(r[1]), sanitize_excel(r[2]), sanitize_excel(r[3]), sanitize_excel(r[4])])
+
+                ws2 = wb.create_sheet("Summary")
+                for row in self.prepare_summary_rows():
+                    ws2.append([sanitize_excel(c) for c in row])
+
+                wb.save(out)
             messagebox.showinfo("Exported", f"Excel exported:\n{out}")
 
             hist = load_history()
@@ -1382,36 +1507,19 @@ class RepoSearchApp(ctk.CTk):
         self.progress_text.set("0.0")
         self.found_chip.configure(text="Found 0")
 
-# ---------- Throttled variable proxy ----------
-class VarProxy:
-    def __init__(self, app, tkvar, interval_ms: int = 120):
-        self.app = app
+# ---------- Queued variable proxy ----------
+class QueuedVar:
+    """Tk variable stand-in for worker threads: set() is applied by the UI queue drain."""
+    def __init__(self, ui_queue, tkvar):
+        self.ui_queue = ui_queue
         self.var = tkvar
-        self.interval = interval_ms
-        self.last = None
-        self.pending = None
-        self.lock = threading.Lock()
 
     def set(self, text):
-        with self.lock:
-            self.pending = text
-        self.app.after(self.interval, self.flush)
-
-    def flush(self):
-        with self.lock:
-            if self.pending is None:
-                return
-            text = self.pending
-            self.pending = None
-        try:
-            if text != self.last:
-                self.var.set(text)
-                self.last = text
-        except Exception:
-            pass
+        self.ui_queue.put(("var", self.var, text))
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # needed by the scan's worker processes in frozen builds
     app = RepoSearchApp()
     app.bind("<Control-f>", lambda e: app.keyword_entry.focus_set())
     app.bind("<Control-l>", lambda e: app.folder_entry.focus_set())
@@ -2,100 +2,289 @@ import os
 import sys
 import subprocess
 import csv
+import hashlib
+import io
+import mmap
+import re
+import queue
+import shutil
+import tempfile
+import threading
+import importlib.util
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import tempfile
 import urllib.parse
-import git
-from git.remote import RemoteProgress
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import git
+    from git.remote import RemoteProgress
+except ImportError:
+    git = None
+    RemoteProgress = object
 
 # ---------------- Dependency Installer ---------------- #
-def ensure_dependency(package, version=None):
+# pip package name -> import name. Presence is checked with find_spec, which
+# locates a module without importing it; pip only runs when the user asks.
+DEPENDENCIES = {"gitpython": "git", "xlsxwriter": "xlsxwriter"}
+
+def missing_dependencies():
+    return [package for package, module in DEPENDENCIES.items() if importlib.util.find_spec(module) is None]
+
+def install_dependencies(packages, ui_queue):
+    # Runs on a background thread; the outcome is posted to the UI queue
+    ui_queue.put(("status", f"Installing {', '.join(packages)}...", "blue"))
     try:
-        __import__(package)
-        return True
-    except ImportError:
-        try:
-            if version:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", f"{package}=={version}"])
-            else:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-            return True
-        except Exception as e:
-            messagebox.showerror("Dependency Install Failed", f"Failed to install {package}: {e}")
-            return False
-
-ensure_dependency("gitpython")
-ensure_dependency("openpyxl")
-import openpyxl
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *packages])
+    except Exception as e:
+        ui_queue.put(("install_error", packages, e))
+        return
+    ui_queue.put(("installed", packages))
 
 # ---------------- Export Functions ---------------- #
 def export_csv(results, output_file="search_results.csv"):
     if not results:
         messagebox.showwarning("No Results", "No results found to export.")
         return
-    with open(output_file, mode="w", newline="", encoding="utf-8") as file:
+    # 1 MiB buffer and a generator fed to writerows: no second copy of the rows
+    with open(output_file, mode="w", newline="", encoding="utf-8", buffering=1 << 20) as file:
         writer = csv.writer(file)
         writer.writerow(["#", "File Path", "Line Number", "Line Content"])
-        for idx, row in enumerate(results, start=1):
-            writer.writerow([idx] + [str(x) for x in row])
+        writer.writerows((idx, file_path, line_no, line_text)
+                         for idx, (file_path, line_no, line_text) in enumerate(results, start=1))
     messagebox.showinfo("Export Complete", f"Results exported to {os.path.abspath(output_file)}")
 
 def export_excel(results, output_file="search_results.xlsx"):
     if not results:
         messagebox.showwarning("No Results", "No results found to export.")
         return
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Search Results"
-    ws.append(["#", "File Path", "Line Number", "Line Content"])
+    if importlib.util.find_spec("xlsxwriter") is None:
+        messagebox.showerror("Missing Dependency", "xlsxwriter is not installed. Use 'Install Dependencies' first.")
+        return
+    import xlsxwriter
+    # constant_memory flushes each row to the sheet XML as it is written (rows
+    # must go top to bottom); result text is stored verbatim, never as a
+    # formula, hyperlink or number
+    wb = xlsxwriter.Workbook(output_file, {
+        "constant_memory": True,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+        "strings_to_numbers": False,
+    })
+    ws = wb.add_worksheet("Search Results")
+    ws.write_row(0, 0, ["#", "File Path", "Line Number", "Line Content"])
     for idx, row in enumerate(results, start=1):
-        ws.append([idx] + [str(x) for x in row])
-    wb.save(output_file)
+        ws.write_row(idx, 0, [idx] + [str(x) for x in row])
+    wb.close()
     messagebox.showinfo("Export Complete", f"Results exported to {os.path.abspath(output_file)}")
 
 # ---------------- Clone Progress ---------------- #
 class CloneProgress(RemoteProgress):
-    def __init__(self, progress_bar, status_label):
+    # Called on the search thread; progress is posted to the UI queue
+    def __init__(self, ui_queue):
         super().__init__()
-        self.progress_bar = progress_bar
-        self.status_label = status_label
+        self.ui_queue = ui_queue
 
     def update(self, op_code, cur_count, max_count=None, message=''):
         if max_count:
-            percent = (cur_count / max_count) * 100
-            self.progress_bar["value"] = percent
-            self.progress_bar.update_idletasks()
+            self.ui_queue.put(("progress", (cur_count / max_count) * 100))
 
 # ---------------- Search Logic ---------------- #
-def search_in_files(base_path, keyword, extensions, tree, progress_bar, count_var):
-    results = []
-    file_list = []
-    for root, _, files in os.walk(base_path):
-        for file in files:
-            if extensions == ["*"] or any(file.endswith(ext) for ext in extensions):
-                file_list.append(os.path.join(root, file))
-    total_files = len(file_list)
-    match_count = 0
-    for idx, file in enumerate(file_list, start=1):
+# Directory names never descended into; the clone's own .git is the big one.
+# Default for the "Skip Directories" field, which can override it per search.
+SKIP_DIRS = frozenset({".git", "node_modules", ".venv", "venv", "__pycache__", ".idea", ".mypy_cache", "dist", "build"})
+
+def iter_files(base_path, extensions, skip_dirs=SKIP_DIRS):
+    # os.scandir DirEntry type checks reuse the readdir data instead of an extra stat per entry
+    ext_tuple = None if extensions == ["*"] else tuple(extensions)  # str.endswith takes a tuple natively
+    stack = [base_path]
+    while stack:
         try:
-            with open(file, "r", encoding="utf-8", errors="ignore") as f:
-                for i, line in enumerate(f, start=1):
-                    line_text = line.strip()
-                    # Case-insensitive exact match
-                    if any(word.lower() == keyword.lower() for word in line_text.split()):
-                        match_count += 1
-                        results.append((file, i, line_text))
-                        tree.insert("", "end", values=(len(results), file, i, line_text), tags=("highlight",))
-        except Exception:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        # like os.walk, don't descend into linked dirs
+                        if not entry.is_symlink() and entry.name not in skip_dirs:
+                            stack.append(entry.path)
+                    elif ext_tuple is None or entry.name.endswith(ext_tuple):
+                        yield entry.path
+        except OSError:
             continue
-        progress = (idx / max(1, total_files)) * 100
-        progress_bar["value"] = progress
-        progress_bar.update_idletasks()
-    count_var.set(f"Found Keywords: {match_count}")
+
+# Non-ASCII letters that re.IGNORECASE matches to an ASCII one in str patterns;
+# this covers the two ("İ", "K") whose str.lower() contains an ASCII letter
+_FOLD_EXTRAS = {"i": ("\u0130", "\u0131"), "k": ("\u212a",), "s": ("\u017f",)}
+
+def _bytes_keyword_pattern(keyword):
+    # Case-insensitive pattern for the ASCII keyword in raw UTF-8 bytes; it also
+    # accepts the encoded non-ASCII letters that str matching folds onto i, k
+    # and s, so no line the decoded check would accept is skipped
+    parts = []
+    for ch in keyword:
+        alts = [re.escape(ch.encode())] + [re.escape(x.encode()) for x in _FOLD_EXTRAS.get(ch.lower(), ())]
+        parts.append(alts[0] if len(alts) == 1 else b"(?:" + b"|".join(alts) + b")")
+    return re.compile(b"".join(parts), re.IGNORECASE)
+
+_LINE_END = re.compile(rb"[\r\n]")
+
+@lru_cache(maxsize=8)
+def _keyword_patterns(keyword):
+    # Compiled once per worker process. The line matcher is the case-insensitive
+    # exact-token match: keyword bounded by whitespace or the line ends, compared
+    # lowercased as str.lower() does. re.IGNORECASE folds more beyond ASCII
+    # (e.g. "ſ" matches "s"), so it only stands in for lower() on ASCII lines.
+    lowered = re.compile(rf"(?<!\S){re.escape(keyword.lower())}(?!\S)").search
+    if keyword.isascii():
+        folded = re.compile(rf"(?<!\S){re.escape(keyword)}(?!\S)", re.IGNORECASE).search
+        line_match = lambda line: folded(line) if line.isascii() else lowered(line.lower())
+        return _bytes_keyword_pattern(keyword), line_match
+    return None, lambda line: lowered(line.lower())
+
+def _scan_file(path, keyword):
+    # Runs in a worker process: only plain, picklable arguments and results
+    matches = []
+    bytes_re, line_match = _keyword_patterns(keyword)
+    try:
+        with open(path, "rb") as f:
+            head = f.read(512)
+            if not head or b"\x00" in head:
+                return matches  # empty (can't be mapped) or binary
+            if bytes_re is None:
+                # re.IGNORECASE on bytes only folds ASCII; scan decoded lines instead
+                f.seek(0)
+                for i, line in enumerate(io.TextIOWrapper(f, encoding="utf-8", errors="ignore"), start=1):
+                    if line_match(line):
+                        matches.append((path, i, line.strip()))
+                return matches
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Search the raw bytes in C; only lines holding a hit are decoded.
+                # Lines end at \n, \r\n or a lone \r, as in a text-mode read.
+                # Each stretch between hits is scanned once, so the cost stays
+                # linear in the file size however many hits there are.
+                line_no, counted_to, line_end = 1, 0, -1
+                for hit in bytes_re.finditer(mm):
+                    if hit.start() < line_end:
+                        continue  # this line was already checked
+                    skipped = mm[counted_to:hit.start()]
+                    line_no += skipped.count(b"\n") + skipped.count(b"\r") - skipped.count(b"\r\n")
+                    start = counted_to = counted_to + max(skipped.rfind(b"\n"), skipped.rfind(b"\r")) + 1
+                    end = _LINE_END.search(mm, hit.end())
+                    line_end = end.start() if end else len(mm)
+                    line_text = mm[start:line_end].decode("utf-8", errors="ignore").strip()
+                    if line_match(line_text):
+                        matches.append((path, line_no, line_text))
+    except Exception:
+        pass
+    return matches
+
+def search_in_files(base_path, keyword, extensions, ui_queue, cancel_event, skip_dirs=SKIP_DIRS):
+    results = []
+    file_list = list(iter_files(base_path, extensions, skip_dirs))
+    total_files = len(file_list)
+    # Files are scanned in worker processes; results come back in file order
+    # and are posted to the UI queue. Rows and progress are flushed at most
+    # ~100 times so Tk isn't redrawn once per file.
+    step = max(1, total_files // 100)
+    flushed = scanned = 0
+
+    def flush():
+        nonlocal flushed
+        rows = [(n, file, i, line_text) for n, (file, i, line_text) in enumerate(results[flushed:], start=flushed + 1)]
+        for start in range(0, len(rows), 500):
+            ui_queue.put(("rows", rows[start:start + 500]))
+        flushed = len(results)
+        ui_queue.put(("progress", (scanned / max(1, total_files)) * 100))
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        for idx, matches in enumerate(ex.map(_scan_file, file_list, [keyword] * total_files, chunksize=32), start=1):
+            if cancel_event.is_set():
+                ex.shutdown(wait=False, cancel_futures=True)
+                break
+            results.extend(matches)
+            scanned = idx
+            if idx % step == 0 or idx == total_files:
+                flush()
+    if flushed < len(results):
+        flush()  # cancelled between flushes: every returned row still reaches the tree
+    ui_queue.put(("count", len(results)))
     return results
 
+# ---------------- Clone Cache ---------------- #
+# Clones are kept between searches and refreshed with a fetch instead of
+# being cloned again; the least recently used ones beyond the limit are removed.
+# Evicted clones are moved into CLONE_TRASH_DIR (a cheap rename) and deleted on
+# a daemon thread, so a search never waits for thousands of files to unlink.
+CLONE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".scan_utility", "clones")
+CLONE_TRASH_DIR = os.path.join(os.path.expanduser("~"), ".scan_utility", "trash")
+MAX_CACHED_CLONES = 5
+
+def clone_cache_dir(repo_url):
+    return os.path.join(CLONE_CACHE_DIR, hashlib.sha256(repo_url.encode()).hexdigest()[:16])
+
+def evict_cached_clones(keep=MAX_CACHED_CLONES):
+    try:
+        with os.scandir(CLONE_CACHE_DIR) as it:
+            clones = sorted((e for e in it if e.is_dir()), key=lambda e: e.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+    stale = clones[keep:]
+    if stale:
+        os.makedirs(CLONE_TRASH_DIR, exist_ok=True)
+        holder = tempfile.mkdtemp(dir=CLONE_TRASH_DIR)  # unique name per eviction
+        for entry in stale:
+            try:
+                os.replace(entry.path, os.path.join(holder, entry.name))
+            except OSError:
+                pass  # e.g. a file still open on Windows; retried next eviction
+    if os.path.isdir(CLONE_TRASH_DIR):
+        # also sweeps anything left behind by a previous run that exited mid-delete
+        threading.Thread(target=empty_clone_trash, daemon=True).start()
+
+def empty_clone_trash():
+    try:
+        with os.scandir(CLONE_TRASH_DIR) as it:
+            entries = [e.path for e in it]
+    except OSError:
+        return
+    for path in entries:
+        shutil.rmtree(path, ignore_errors=True)
+
+def update_clone(repo_url, repo_url_auth):
+    clone_dir = clone_cache_dir(repo_url)
+    try:
+        if os.path.isdir(os.path.join(clone_dir, ".git")):
+            ui_queue.put(("status", "Updating cached repository...", "blue"))
+            repo = git.Repo(clone_dir)
+            # Fetch by URL so the token is used for this call only, never stored
+            repo.git.fetch(repo_url_auth, "--depth=1")
+            repo.git.reset("--hard", "FETCH_HEAD")
+        else:
+            ui_queue.put(("status", "Cloning repository...", "blue"))
+            try:
+                # Only the working tree is scanned: skip history, other branches and tags
+                repo = git.Repo.clone_from(
+                    repo_url_auth, clone_dir, progress=CloneProgress(ui_queue),
+                    depth=1, single_branch=True, multi_options=["--filter=blob:none", "--no-tags"],
+                )
+            except git.GitCommandError:
+                # e.g. a server without partial-clone support; retry as a plain clone
+                shutil.rmtree(clone_dir, ignore_errors=True)
+                repo = git.Repo.clone_from(repo_url_auth, clone_dir, progress=CloneProgress(ui_queue))
+            repo.remotes.origin.set_url(repo_url)  # don't leave the token in .git/config
+    except Exception:
+        shutil.rmtree(clone_dir, ignore_errors=True)  # never reuse a half-updated clone
+        raise
+    os.utime(clone_dir)  # mark as most recently used
+    evict_cached_clones()
+    return clone_dir
+
 # ---------------- Run Search ---------------- #
+# The clone and scan run on a background thread. It never touches Tk: it
+# posts to ui_queue, which drain_ui_queue() applies from the Tk main loop.
+ui_queue = queue.Queue()
+cancel_event = threading.Event()
+
 def run_search():
     repo_url = repo_url_entry.get().strip()
     username = username_entry.get().strip()
@@ -106,39 +295,107 @@ def run_search():
     if not repo_url or not username or not token or not keyword:
         messagebox.showwarning("Input Error", "Please provide all required fields.")
         return
+    if git is None:
+        messagebox.showerror("Missing Dependency", "GitPython is not installed. Use 'Install Dependencies' first.")
+        return
 
-    extensions = ["*"] if exts_choice.lower() == "all" else [e.strip() for e in exts_choice.split(",")]
+    if exts_choice.lower() == "all":
+        extensions = ["*"]
+    else:
+        # "py" and ".py" both mean ".py"; empty items would match every file
+        extensions = [e if e.startswith(".") else "." + e for e in (e.strip() for e in exts_choice.split(",")) if e]
+        if not extensions:
+            messagebox.showwarning("Input Error", "Please provide at least one extension.")
+            return
+    skip_dirs = frozenset(d.strip() for d in skip_dirs_var.get().split(",") if d.strip())
 
     for item in results_tree.get_children():
         results_tree.delete(item)
     progress_bar["value"] = 0
     count_var.set("Found Keywords: 0")
-    results = []
+    cancel_event.clear()
+    run_button.config(state="disabled")
+    cancel_button.config(state="normal")
+    threading.Thread(target=search_worker, args=(repo_url, username, token, keyword, extensions, skip_dirs), daemon=True).start()
+
+def cancel_search():
+    cancel_event.set()
+    cancel_button.config(state="disabled")
+    status_label.config(text="Cancelling...", foreground="blue")
 
-    temp_dir = tempfile.mkdtemp()
+def search_worker(repo_url, username, token, keyword, extensions, skip_dirs):
     try:
         token_encoded = urllib.parse.quote(token)
         url_parts = repo_url.replace("https://", "").split("/", 1)
         repo_url_auth = f"https://{username}:{token_encoded}@{url_parts[0]}/{url_parts[1]}"
 
-        status_label.config(text="Cloning repository...", foreground="blue")
-        root.update_idletasks()
-        git.Repo.clone_from(repo_url_auth, temp_dir, progress=CloneProgress(progress_bar, status_label))
-        status_label.config(text="Repository cloned successfully", foreground="green")
-
-        results.extend(search_in_files(temp_dir, keyword, extensions, results_tree, progress_bar, count_var))
-
-        if messagebox.askyesno("Cleanup", "Do you want to delete the cloned repository?"):
-            import shutil
-            shutil.rmtree(temp_dir)
+        clone_dir = update_clone(repo_url, repo_url_auth)
+        ui_queue.put(("status", "Repository ready", "green"))
 
+        results = [] if cancel_event.is_set() else search_in_files(clone_dir, keyword, extensions, ui_queue, cancel_event, skip_dirs)
     except Exception as e:
-        status_label.config(text="Failed to clone repository", foreground="red")
-        messagebox.showerror("Clone Error", f"Failed to clone repository: {e}")
+        ui_queue.put(("error", e))
         return
+    ui_queue.put(("done", results))
 
+def finish_search(results):
+    # Runs on the Tk main loop once the worker has posted its last row
+    run_button.config(state="normal")
+    cancel_button.config(state="disabled")
     run_search.results = results
-    messagebox.showinfo("Search Complete", f"Found {len(results)} matches.")
+    if cancel_event.is_set():
+        status_label.config(text="Search cancelled", foreground="red")
+        messagebox.showinfo("Search Cancelled", f"Search cancelled. Found {len(results)} matches before stopping.")
+    else:
+        messagebox.showinfo("Search Complete", f"Found {len(results)} matches.")
+
+def drain_ui_queue(budget=500):
+    # 'budget' caps the rows/messages applied per tick so the UI stays responsive
+    try:
+        while budget > 0:
+            kind, *args = ui_queue.get_nowait()
+            budget -= 1
+            if kind == "rows":
+                # Detach the scrollbar so it is recomputed once per batch, not per row;
+                # row numbers double as iids, sparing Tk its auto-id generation
+                results_tree.configure(yscrollcommand="")
+                for row in args[0]:
+                    results_tree.insert("", "end", iid=str(row[0]), values=row, tags=("highlight",))
+                results_tree.configure(yscrollcommand=vsb.set)
+                budget -= len(args[0]) - 1
+            elif kind == "progress":
+                progress_bar["value"] = args[0]
+            elif kind == "count":
+                count_var.set(f"Found Keywords: {args[0]}")
+            elif kind == "status":
+                status_label.config(text=args[0], foreground=args[1])
+            elif kind == "error":
+                run_button.config(state="normal")
+                cancel_button.config(state="disabled")
+                status_label.config(text="Failed to clone repository", foreground="red")
+                messagebox.showerror("Clone Error", f"Failed to clone repository: {args[0]}")
+            elif kind == "done":
+                finish_search(*args)
+            elif kind == "installed":
+                install_button.grid_remove()
+                status_label.config(text="Dependencies installed", foreground="green")
+                messagebox.showinfo("Install Complete", f"Installed {', '.join(args[0])}. Restart the application to use them.")
+            elif kind == "install_error":
+                install_button.config(state="normal")
+                status_label.config(text="Dependency install failed", foreground="red")
+                messagebox.showerror("Dependency Install Failed", f"Failed to install {', '.join(args[0])}: {args[1]}")
+    except queue.Empty:
+        pass
+    finally:
+        root.after(50, drain_ui_queue)
+
+def install_missing():
+    packages = missing_dependencies()
+    if not packages:
+        install_button.grid_remove()
+        return
+    install_button.config(state="disabled")
+    threading.Thread(target=install_dependencies, args=(packages, ui_queue), daemon=True).start()
 
 def export_results(fmt):
     if not hasattr(run_search, "results") or not run_search.results:
@@ -150,77 +407,98 @@ def export_results(fmt):
         export_excel(run_search.results)
 
 # ---------------- Build UI ---------------- #
-root = tk.Tk()
-root.title("Bitbucket Keyword Search Utility")
-root.geometry("1400x900")
-
-padx_val = 10
-pady_val = 5
-
-# Repo URL
-tk.Label(root, text="Bitbucket Repository HTTPS URL:").grid(row=0, column=0, sticky="e", padx=padx_val, pady=pady_val)
-repo_url_entry = tk.Entry(root, width=60)
-repo_url_entry.grid(row=0, column=1, sticky="w", padx=padx_val, pady=pady_val)
-
-# Username
-tk.Label(root, text="Bitbucket Username:").grid(row=1, column=0, sticky="e", padx=padx_val, pady=pady_val)
-username_entry = tk.Entry(root, width=60)
-username_entry.grid(row=1, column=1, sticky="w", padx=padx_val, pady=pady_val)
-
-# HTTP Access Token
-tk.Label(root, text="HTTP Access Token:").grid(row=2, column=0, sticky="e", padx=padx_val, pady=pady_val)
-token_entry = tk.Entry(root, width=60, show="*")
-token_entry.grid(row=2, column=1, sticky="w", padx=padx_val, pady=pady_val)
-
-# Keyword
-tk.Label(root, text="Keyword to Search:").grid(row=3, column=0, sticky="e", padx=padx_val, pady=pady_val)
-keyword_entry = tk.Entry(root, width=60)
-keyword_entry.grid(row=3, column=1, sticky="w", padx=padx_val, pady=pady_val)
-
-# File Extensions
-tk.Label(root, text="File Extensions (comma separated or All):").grid(row=4, column=0, sticky="e", padx=padx_val, pady=pady_val)
-extension_var = tk.StringVar(value="All")
-extension_entry = tk.Entry(root, textvariable=extension_var, width=60)
-extension_entry.grid(row=4, column=1, sticky="w", padx=padx_val, pady=pady_val)
-
-# Buttons
-tk.Button(root, text="Run Search", command=run_search, bg="lightblue", width=15).grid(row=5, column=0, padx=padx_val, pady=pady_val)
-tk.Button(root, text="Export CSV", command=lambda: export_results("csv"), bg="lightgreen", width=15).grid(row=5, column=1, padx=padx_val, pady=pady_val)
-tk.Button(root, text="Export Excel", command=lambda: export_results("excel"), bg="lightgreen", width=15).grid(row=5, column=2, padx=padx_val, pady=pady_val)
-
-# Status Label
-status_label = tk.Label(root, text="Repository Status: Not started", foreground="black")
-status_label.grid(row=6, column=0, columnspan=3, sticky="w", padx=padx_val, pady=pady_val)
-
-# Keyword count
-count_var = tk.StringVar(value="Found Keywords: 0")
-tk.Label(root, textvariable=count_var, font=("Arial", 10, "bold")).grid(row=7, column=0, columnspan=3, sticky="w", padx=padx_val, pady=pady_val)
-
-# Progress Bar
-progress_bar = ttk.Progressbar(root, orient="horizontal", length=800, mode="determinate")
-progress_bar.grid(row=8, column=0, columnspan=3, padx=padx_val, pady=pady_val)
-
-# Results Treeview
-results_frame = tk.Frame(root)
-results_frame.grid(row=9, column=0, columnspan=3, sticky="nsew", padx=padx_val, pady=pady_val)
-
-columns = ("#", "File Path", "Line Number", "Line Content")
-results_tree = ttk.Treeview(results_frame, columns=columns, show="headings")
-for col in columns:
-    results_tree.heading(col, text=col)
-    results_tree.column(col, anchor="center" if col in ["#", "Line Number"] else "w", width=200, stretch=True)
-results_tree.column("Line Content", width=600, anchor="w", stretch=True)
-
-vsb = ttk.Scrollbar(results_frame, orient="vertical", command=results_tree.yview)
-hsb = ttk.Scrollbar(results_frame, orient="horizontal", command=results_tree.xview)
-results_tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-results_tree.grid(row=0, column=0, sticky="nsew")
-vsb.grid(row=0, column=1, sticky="ns")
-hsb.grid(row=1, column=0, sticky="ew")
-results_frame.grid_rowconfigure(0, weight=1)
-results_frame.grid_columnconfigure(0, weight=1)
-
-results_tree.tag_configure("highlight", font=("Arial", 10, "bold"))
-
-root.mainloop()
+if __name__ == "__main__":
+    # Worker processes re-import this module; keep the UI out of them
+    root = tk.Tk()
+    root.title("Bitbucket Keyword Search Utility")
+    root.geometry("1400x900")
+
+    padx_val = 10
+    pady_val = 5
+
+    # Repo URL
+    tk.Label(root, text="Bitbucket Repository HTTPS URL:").grid(row=0, column=0, sticky="e", padx=padx_val, pady=pady_val)
+    repo_url_entry = tk.Entry(root, width=60)
+    repo_url_entry.grid(row=0, column=1, sticky="w", padx=padx_val, pady=pady_val)
+
+    # Username
+    tk.Label(root, text="Bitbucket Username:").grid(row=1, column=0, sticky="e", padx=padx_val, pady=pady_val)
+    username_entry = tk.Entry(root, width=60)
+    username_entry.grid(row=1, column=1, sticky="w", padx=padx_val, pady=pady_val)
+
+    # HTTP Access Token
+    tk.Label(root, text="HTTP Access Token:").grid(row=2, column=0, sticky="e", padx=padx_val, pady=pady_val)
+    token_entry = tk.Entry(root, width=60, show="*")
+    token_entry.grid(row=2, column=1, sticky="w", padx=padx_val, pady=pady_val)
+
+    # Keyword
+    tk.Label(root, text="Keyword to Search:").grid(row=3, column=0, sticky="e", padx=padx_val, pady=pady_val)
+    keyword_entry = tk.Entry(root, width=60)
+    keyword_entry.grid(row=3, column=1, sticky="w", padx=padx_val, pady=pady_val)
+
+    # File Extensions
+    tk.Label(root, text="File Extensions (comma separated or All):").grid(row=4, column=0, sticky="e", padx=padx_val, pady=pady_val)
+    extension_var = tk.StringVar(value="All")
+    extension_entry = tk.Entry(root, textvariable=extension_var, width=60)
+    extension_entry.grid(row=4, column=1, sticky="w", padx=padx_val, pady=pady_val)
+
+    # Directories skipped while scanning
+    tk.Label(root, text="Skip Directories (comma separated):").grid(row=5, column=0, sticky="e", padx=padx_val, pady=pady_val)
+    skip_dirs_var = tk.StringVar(value=",".join(sorted(SKIP_DIRS)))
+    skip_dirs_entry = tk.Entry(root, textvariable=skip_dirs_var, width=60)
+    skip_dirs_entry.grid(row=5, column=1, sticky="w", padx=padx_val, pady=pady_val)
+
+    # Buttons
+    run_button = tk.Button(root, text="Run Search", command=run_search, bg="lightblue", width=15)
+    run_button.grid(row=6, column=0, padx=padx_val, pady=pady_val)
+    tk.Button(root, text="Export CSV", command=lambda: export_results("csv"), bg="lightgreen", width=15).grid(row=6, column=1, padx=padx_val, pady=pady_val)
+    tk.Button(root, text="Export Excel", command=lambda: export_results("excel"), bg="lightgreen", width=15).grid(row=6, column=2, padx=padx_val, pady=pady_val)
+    cancel_button = tk.Button(root, text="Cancel", command=cancel_search, bg="lightcoral", width=15, state="disabled")
+    cancel_button.grid(row=6, column=3, padx=padx_val, pady=pady_val)
+    # Only offered when a dependency is missing; pip runs on demand, never at startup
+    install_button = tk.Button(root, text="Install Dependencies", command=install_missing, bg="khaki", width=18)
+    install_button.grid(row=7, column=3, padx=padx_val, pady=pady_val)
+
+    # Status Label
+    status_label = tk.Label(root, text="Repository Status: Not started", foreground="black")
+    status_label.grid(row=7, column=0, columnspan=3, sticky="w", padx=padx_val, pady=pady_val)
+
+    # Keyword count
+    count_var = tk.StringVar(value="Found Keywords: 0")
+    tk.Label(root, textvariable=count_var, font=("Arial", 10, "bold")).grid(row=8, column=0, columnspan=3, sticky="w", padx=padx_val, pady=pady_val)
+
+    # Progress Bar
+    progress_bar = ttk.Progressbar(root, orient="horizontal", length=800, mode="determinate")
+    progress_bar.grid(row=9, column=0, columnspan=3, padx=padx_val, pady=pady_val)
+
+    # Results Treeview
+    results_frame = tk.Frame(root)
+    results_frame.grid(row=10, column=0, columnspan=3, sticky="nsew", padx=padx_val, pady=pady_val)
+
+    columns = ("#", "File Path", "Line Number", "Line Content")
+    results_tree = ttk.Treeview(results_frame, columns=columns, show="headings")
+    for col in columns:
+        results_tree.heading(col, text=col)
+        results_tree.column(col, anchor="center" if col in ["#", "Line Number"] else "w", width=200, stretch=True)
+    results_tree.column("Line Content", width=600, anchor="w", stretch=True)
+
+    vsb = ttk.Scrollbar(results_frame, orient="vertical", command=results_tree.yview)
+    hsb = ttk.Scrollbar(results_frame, orient="horizontal", command=results_tree.xview)
+    results_tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+
+    results_tree.grid(row=0, column=0, sticky="nsew")
+    vsb.grid(row=0, column=1, sticky="ns")
+    hsb.grid(row=1, column=0, sticky="ew")
+    results_frame.grid_rowconfigure(0, weight=1)
+    results_frame.grid_columnconfigure(0, weight=1)
+
+    results_tree.tag_configure("highlight", font=("Arial", 10, "bold"))
+
+    missing = missing_dependencies()
+    if missing:
+        status_label.config(text=f"Missing dependencies: {', '.join(missing)}", foreground="red")
+    else:
+        install_button.grid_remove()
+
+    root.after(50, drain_ui_queue)
+    root.mainloop()
@@ -1,45 +1,201 @@
 #!/usr/bin/env python3
+import os
 import sys
+import hashlib
 import uuid as uuidlib
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def fetch_trace_metadata(org_id, trace_id, auth_header, api_key):
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+BASE_URL = "https://app.contrastsecurity.com/Contrast/api/ng"
+
+def _env_int(name, default, minimum=1):
+    # integer setting from the environment; values below 'minimum' are raised to it
+    raw = os.getenv(name, default)
+    try:
+        return max(minimum, int(raw))
+    except ValueError:
+        raise SystemExit(f"{name} must be an integer, got {raw!r}")
+
+# Listing pages are the request batches: PAGE_SIZE traces per request,
+# MAX_WORKERS requests in flight. Both can be tuned from the environment.
+PAGE_SIZE = _env_int("CONTRAST_PAGE_SIZE", "50")
+MAX_WORKERS = _env_int("CONTRAST_WORKERS", "8")
+# Seconds a cached listing page stays fresh. Caching is opt-in: it needs
+# requests-cache and a CONTRAST_CACHE_TTL above 0 (the default disables it).
+CACHE_TTL = _env_int("CONTRAST_CACHE_TTL", "0", minimum=0)
+CACHE_ENABLED = requests_cache is not None and CACHE_TTL > 0
+
+# Shared session so pages reuse keep-alive connections; the pool is sized to
+# the worker count so concurrent page fetches don't queue for a socket, and
+# transient gateway errors are retried on the same pooled connections.
+# With caching enabled, re-runs are answered from a disk cache that also
+# honours the server's ETag/Cache-Control headers.
+_CREDENTIAL_HEADERS = ("Authorization", "API-Key")
+
+def _cache_key(request, **kwargs):
+    # requests-cache drops credential headers from its keys (and redacts them
+    # from stored requests); fold a digest of them back into the key so one
+    # credential's responses are never served to another
+    creds = "\0".join(request.headers.get(h) or "" for h in _CREDENTIAL_HEADERS)
+    base = requests_cache.create_key(request, **kwargs)
+    return hashlib.sha256(f"{base}\0{creds}".encode()).hexdigest()[:32]
+
+if CACHE_ENABLED:
+    SESSION = requests_cache.CachedSession(
+        os.path.join(os.path.expanduser("~"), ".cache", "contrast", "http_cache"),
+        expire_after=CACHE_TTL,
+        cache_control=True,
+        key_fn=_cache_key,
+        ignored_parameters=[*requests_cache.policy.DEFAULT_IGNORED_PARAMS, "API-Key"],
+    )
+else:
+    SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=MAX_WORKERS,
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+))
+
+# Markdown record per trace; the format method is bound once at import.
+_TRACE_RECORD = (
+    "\n## Trace {uuid} _(Status: {status})_\n"
+    "- **Rule Name:** {rule_name}\n"
+    "- **Rule Title:** {rule_title}\n"
+    "- **Title:** {title}\n"
+    "- **Sub-title:** {sub_title}\n"
+    "- **Severity:** {severity}\n"
+    "- **Server Environments:** {servers}\n"
+    "- **Total Notes:** {notes}\n"
+    "- **Total Traces Received:** {traces}\n"
+).format
+
+_REPORT_HEADER = "# Contrast Security Trace Metadata Report\nAnalysis ID: {analysis_id}\n".format
+_ERROR_RECORD = "\n## Trace {uuid}  _(Error)_\n".format
+
+def _extract_metadata(trace):
+    get = trace.get
+    return {
+        "uuid": get("uuid"),
+        "rule_name": get("rule_name"),
+        "rule_title": get("rule_title"),
+        "title": get("title"),
+        "sub_title": get("sub_title"),
+        "severity": get("severity"),
+        "severity_label": get("severity_label"),
+        "status": get("status"),
+        "server_environments": [name for env in get("server_environments") or () if (name := env.get("name"))],
+        "total_notes": get("total_notes"),
+        "total_traces_received": get("total_traces_received")
+    }
+
+def _fetch_page(url, headers, offset):
+    params = {
+        "expand": "server_environments",  # include server environments in response
+        "limit": PAGE_SIZE,
+        "offset": offset,
+    }
+    try:
+        response = SESSION.get(url, headers=headers, params=params)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        raise RuntimeError(f"HTTP error fetching traces (offset {offset}): {e}")
+    # orjson parses the raw bytes directly, skipping the utf-8 decode step
+    return orjson.loads(response.content) if orjson else response.json()
+
+def fetch_traces_metadata(org_id, trace_ids, auth_header, api_key):
     """
-    Fetch metadata for a single trace ID using the /orgtraces/filter endpoint.
+    Fetch metadata for the given trace IDs using the /orgtraces/filter endpoint.
+    The org listing is requested once for all IDs and only the requested traces
+    are extracted; the result maps trace UUID -> metadata. IDs missing from the
+    response are absent from the result.
+    The first page reports the total count; remaining pages are fetched
+    concurrently and outstanding pages are cancelled once every ID is found.
+    Only a failure of the first page raises; later page failures are logged.
     """
-    base_url = "https://app.contrastsecurity.com/Contrast/api/ng"
-    url = f"{base_url}/{org_id}/orgtraces/filter"
-    params = {"expand": "server_environments"}  # include server environments in response
+    url = f"{BASE_URL}/{org_id}/orgtraces/filter"
     headers = {
         "Authorization": auth_header,
         "API-Key": api_key,
         "Accept": "application/json"
     }
-    try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        raise RuntimeError(f"HTTP error fetching trace {trace_id}: {e}")
-    data = response.json()
-    traces = data.get("traces") or []
-    for trace in traces:
-        if trace.get("uuid") == trace_id:
-            # Found the matching trace; extract fields
-            return {
-                "uuid": trace.get("uuid"),
-                "rule_name": trace.get("rule_name"),
-                "rule_title": trace.get("rule_title"),
-                "title": trace.get("title"),
-                "sub_title": trace.get("sub_title"),
-                "severity": trace.get("severity"),
-                "severity_label": trace.get("severity_label"),
-                "status": trace.get("status"),
-                "server_environments": [env.get("name") for env in trace.get("server_environments", []) if env.get("name")],
-                "total_notes": trace.get("total_notes"),
-                "total_traces_received": trace.get("total_traces_received")
-            }
-    raise RuntimeError(f"Trace {trace_id} not found in API response")
+    wanted = set(trace_ids)
+    found = {}
+
+    def collect(data):
+        for trace in data.get("traces") or []:
+            tid = trace.get("uuid")
+            if tid in wanted and tid not in found:
+                found[tid] = _extract_metadata(trace)
+                if len(found) == len(wanted):
+                    return True  # every requested trace found; skip the rest of the listing
+        return False
+
+    first = _fetch_page(url, headers, 0)
+    if collect(first):
+        return found
+    offsets = range(PAGE_SIZE, first.get("count") or 0, PAGE_SIZE)
+    if not offsets:
+        return found
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(offsets))) as ex:
+        futures = [ex.submit(_fetch_page, url, headers, off) for off in offsets]
+        for fut in as_completed(futures):
+            try:
+                data = fut.result()
+            except RuntimeError as e:
+                # one failed page must not sink the batch; its traces report as not found
+                print(f"Warning: {e}", file=sys.stderr)
+                continue
+            if collect(data):
+                for f in futures:
+                    f.cancel()
+                break
+    return found
+
+def _render_trace(info):
+    # _extract_metadata always sets every key
+    sev = info["severity"]
+    sev_lbl = info["severity_label"]
+    sev_str = f"{sev}" if sev is not None else ""
+    if sev_lbl:
+        sev_str += f" ({sev_lbl})"
+    servers = info["server_environments"]
+    notes = info["total_notes"]
+    traces = info["total_traces_received"]
+    return _TRACE_RECORD(
+        uuid=info["uuid"],
+        status=info["status"] or "",
+        rule_name=info["rule_name"],
+        rule_title=info["rule_title"],
+        title=info["title"],
+        sub_title=info["sub_title"] or "None",
+        severity=sev_str.strip(),
+        servers=", ".join(servers) if servers else "None",
+        notes=notes if notes is not None else "None",
+        traces=traces if traces is not None else "None",
+    )
+
+def write_report(fh, analysis_id, trace_ids, found):
+    """
+    Stream the Markdown report to the open text file 'fh', one trace record
+    at a time. Trace IDs missing from 'found' get an error heading in place
+    of their record.
+    """
+    fh.write(_REPORT_HEADER(analysis_id=analysis_id))
+    for tid in trace_ids:
+        fh.write(_render_trace(found[tid]) if tid in found else _ERROR_RECORD(uuid=tid))
 
 def main():
     parser = argparse.ArgumentParser(
@@ -49,41 +205,35 @@ def main():
     parser.add_argument("--auth", required=True,
                         help="Base64-encoded Authorization header (username:service-key)")
     parser.add_argument("--api-key", required=True, help="Contrast API key (plaintext)")
-    parser.add_argument("trace_ids", nargs='+', help="One or more trace UUIDs to fetch")
+    parser.add_argument("--out", help="Write the Markdown report to this file instead of stdout")
+    parser.add_argument("trace_ids", nargs='+',
+                        help="One or more trace UUIDs to fetch (space or comma separated)")
     args = parser.parse_args()
+    # Split, strip and de-duplicate in one pass, keeping first-seen order
+    trace_ids = list(dict.fromkeys(filter(None, map(str.strip, ",".join(args.trace_ids).split(",")))))
+    if not trace_ids:
+        parser.error("no trace IDs given")
+
+    if CACHE_ENABLED:
+        print(f"Note: using cached API responses up to {CACHE_TTL}s old (CONTRAST_CACHE_TTL)", file=sys.stderr)
 
     analysis_id = str(uuidlib.uuid4())
-    print("# Contrast Security Trace Metadata Report")
-    print(f"Analysis ID: {analysis_id}")
-
-    for tid in args.trace_ids:
-        try:
-            info = fetch_trace_metadata(args.org, tid, args.auth, args.api_key)
-        except Exception as e:
-            print(f"\n## Trace {tid}  _(Error)_")
-            print(f"- **Error:** {e}", file=sys.stderr)
-            continue
-
-        # Format output for this trace
-        status = info.get("status") or ""
-        print(f"\n## Trace {info['uuid']} _(Status: {status})_")
-        print(f"- **Rule Name:** {info.get('rule_name', '')}")
-        print(f"- **Rule Title:** {info.get('rule_title', '')}")
-        print(f"- **Title:** {info.get('title', '')}")
-        sub = info.get("sub_title") or ""
-        print(f"- **Sub-title:** {sub if sub else 'None'}")
-        sev = info.get("severity")
-        sev_lbl = info.get("severity_label")
-        sev_str = f"{sev}" if sev is not None else ""
-        if sev_lbl:
-            sev_str += f" ({sev_lbl})"
-        print(f"- **Severity:** {sev_str.strip()}")
-        servers = info.get("server_environments") or []
-        print(f"- **Server Environments:** {', '.join(servers) if servers else 'None'}")
-        notes = info.get("total_notes")
-        print(f"- **Total Notes:** {notes if notes is not None else 'None'}")
-        traces = info.get("total_traces_received")
-        print(f"- **Total Traces Received:** {traces if traces is not None else 'None'}")
+    try:
+        found = fetch_traces_metadata(args.org, trace_ids, args.auth, args.api_key)
+        fetch_error = None
+    except Exception as e:
+        found, fetch_error = {}, e
+
+    for tid in trace_ids:
+        if tid not in found:
+            print(f"- **Error:** {fetch_error or f'Trace {tid} not found in API response'}", file=sys.stderr)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            write_report(f, analysis_id, trace_ids, found)
+    else:
+        write_report(sys.stdout, analysis_id, trace_ids, found)
+        sys.stdout.flush()
 
 if __name__ == "__main__":
     main()
@@ -4,14 +4,17 @@ Advanced Keyword Search Utility - Updated:
 - Fixes: Custom extension field visibility (CTkComboBox command)
 - Cancel flow: pause -> confirm -> stop/resume (immediate pause on Cancel click)
 Other functionality unchanged.
-Dependencies: customtkinter, openpyxl, pygments (optional)
+Dependencies: customtkinter, openpyxl, xlsxwriter (optional), pygments (optional)
 """
 
 import os
 import re
+import mmap
 import csv
 import threading
 import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from datetime import datetime
@@ -25,6 +28,11 @@ try:
 except Exception:
     PYGMENTS_AVAILABLE = False
 
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
 # ---------------------- COMMENT MARKERS / TOKENS ----------------------
 SINGLE_LINE_MARKERS = {
     ".py": ["#"],
@@ -65,228 +73,426 @@ MULTI_COMMENT_TOKENS = {
     ".txt": []
 }
 
+MMAP_THRESHOLD = 1024 * 1024  # files above this size are memory-mapped instead of read
+BINARY_SNIFF_BYTES = 8192  # a NUL byte in this much of a file marks it as binary
+UI_REFRESH_INTERVAL = 1 / 30  # seconds between scan-progress repaints (~30 Hz)
+UI_DRAIN_MS = round(UI_REFRESH_INTERVAL * 1000)  # _safe_ui_update drain period
+TREE_INSERT_CHUNK = 500  # result rows inserted into the tree per Tk idle pass
+ENUM_WORKERS = 8  # threads walking top-level subdirectories concurrently
+ENUM_PARALLEL_MIN_DIRS = 4  # fewer top-level subdirectories than this are walked serially
+# directory names never descended into (VCS metadata, dependencies, caches, build output);
+# the default for the skip-directories field, which can override it per search
+SKIP_DIRS = frozenset({".git", "node_modules", ".venv", "venv", "__pycache__", ".idea", ".mypy_cache", "dist", "build"})
+
 # ---------------------- HELPERS ----------------------
+# control characters an xlsx cell can't hold; str.translate drops them in one C pass
+_XLSX_BAD = str.maketrans(dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F]))
+
 def sanitize_excel_value(v):
     if not isinstance(v, str):
         v = str(v)
-    return re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]", "", v)
+    return v.translate(_XLSX_BAD)
+
+def _write_xlsx(out, export_list, keyword, total_matches, ufiles):
+    """
+    Write the Results and Summary sheets to 'out'. xlsxwriter is used when
+    installed: it streams rows to disk instead of building every cell object
+    in memory like openpyxl.
+    """
+    header = ["#", "File Path", "Line Number", "Line Content"]
+    summary = [["--- SUMMARY ---"], ["Search Keyword", keyword], ["Total Matches", total_matches],
+               ["Unique Files Count", len(ufiles)], [], ["Unique Files"]]
+    if xlsxwriter is None:
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Results"
+        ws.append(header)
+        for i, (fp, ln, txt) in enumerate(export_list, start=1):
+            ws.append([i, fp.translate(_XLSX_BAD), ln, txt.translate(_XLSX_BAD)])
+        s = wb.create_sheet(title="Summary")
+        for row in summary:
+            s.append(row)
+        for uf in ufiles:
+            s.append([uf.translate(_XLSX_BAD)])
+        wb.save(out)
+        return
+    # constant_memory writes each row out as soon as the next one starts (rows
+    # must go top to bottom); cell text is stored as-is, never as a formula or link
+    wb = xlsxwriter.Workbook(out, {
+        "constant_memory": True,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+        "strings_to_numbers": False,
+    })
+    ws = wb.add_worksheet("Results")
+    ws.write_row(0, 0, header)
+    for i, (fp, ln, txt) in enumerate(export_list, start=1):
+        ws.write_row(i, 0, (i, fp.translate(_XLSX_BAD), ln, txt.translate(_XLSX_BAD)))
+    s = wb.add_worksheet("Summary")
+    for r, row in enumerate(summary):
+        s.write_row(r, 0, row)
+    for r, uf in enumerate(ufiles, start=len(summary)):
+        s.write_string(r, 0, uf.translate(_XLSX_BAD))
+    wb.close()
+
+_MARKER_RE = {}  # compiled marker scanners, keyed by the markers tuple
 
 def _first_unquoted_marker_index(line, markers):
     """
     Return (idx, marker) of the earliest marker in 'line' that is NOT inside a single/double-quoted string.
     If none found, return (-1, None).
     """
-    earliest = -1
-    earliest_marker = None
-    n = len(line)
-    i = 0
-    in_squote = False
-    in_dquote = False
-    escape = False
-    markers_sorted = sorted(markers, key=lambda m: -len(m))
-
-    while i < n:
-        ch = line[i]
-        if escape:
-            escape = False
-            i += 1
-            continue
-        if ch == "\\":
-            escape = True
-            i += 1
-            continue
-        if not in_dquote and ch == "'" and not in_squote:
-            in_squote = True
-            i += 1
-            continue
-        elif in_squote and ch == "'" and not escape:
-            in_squote = False
-            i += 1
-            continue
-        if not in_squote and ch == '"' and not in_dquote:
-            in_dquote = True
-            i += 1
-            continue
-        elif in_dquote and ch == '"' and not escape:
-            in_dquote = False
-            i += 1
-            continue
-
-        if not in_squote and not in_dquote:
-            for m in markers_sorted:
-                L = len(m)
-                if i + L <= n and line[i:i+L] == m:
-                    return i, m
-        i += 1
+    if not markers:
+        return -1, None
+    key = tuple(markers)
+    pat = _MARKER_RE.get(key)
+    if pat is None:
+        # Escapes and quoted strings (an unterminated one runs to end of line)
+        # are consumed whole, so group 1 only matches a marker outside quotes;
+        # longest markers first so e.g. "//" wins over "/".
+        alternatives = "|".join(re.escape(m) for m in sorted(markers, key=lambda m: -len(m)))
+        pat = _MARKER_RE[key] = re.compile(
+            r"""\\.|'(?:\\.|[^'\\])*(?:'|\\?\Z)|"(?:\\.|[^"\\])*(?:"|\\?\Z)|(""" + alternatives + ")",
+            re.DOTALL,
+        )
+    for m in pat.finditer(line):
+        if m.group(1) is not None:
+            return m.start(1), m.group(1)
     return -1, None
 
+# ---------------------- VarProxy (throttle UI updates) ----------------------
+class VarProxy:
+    """
+    Stand-in for a Tk variable that worker threads can set: the latest value is
+    applied on the Tk thread via after(), at most once per interval_ms.
+    """
+    def __init__(self, tk_root, real_var, interval_ms=120):
+        self.root = tk_root
+        self.real_var = real_var
+        self.interval_ms = interval_ms
+        self._pending = None
+        self._job = None
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        with self._lock:
+            self._pending = value
+            if not self._job:
+                self._job = self.root.after(self.interval_ms, self._flush)
+
+    def _flush(self):
+        with self._lock:
+            if self._pending is not None:
+                try:
+                    self.real_var.set(self._pending)
+                except Exception:
+                    pass
+                self._pending = None
+            self._job = None
+
+    def get(self):
+        return self.real_var.get()
+
 # ---------------------- SEARCH FUNCTION (enhanced) ----------------------
+def _compile_matcher(keyword, exact_match, per_token, case_sensitive):
+    """
+    Return a callable(line) -> match-or-None for the chosen mode; per-token
+    matches the keyword as a whole \\w+ token, exact matches the whole
+    stripped line. Case-insensitive matching compares lowercased text, as
+    str.lower() does. re.IGNORECASE, which saves the lowercased copy, is only
+    used when line and keyword are both ASCII: beyond ASCII it folds more
+    (e.g. "ſ" matches "s") and would change the results.
+    """
+    def build(kw, flags):
+        if per_token:
+            return re.compile(rf"(?<!\w){re.escape(kw)}(?!\w)", flags).search
+        if exact_match:
+            exact = re.compile(re.escape(kw), flags).fullmatch
+            return lambda line: exact(line.strip())
+        return re.compile(re.escape(kw), flags).search
+
+    if case_sensitive:
+        return build(keyword, 0)
+    lowered = build(keyword.lower(), 0)
+    if not keyword.isascii():
+        return lambda line: lowered(line.lower())
+    folded = build(keyword, re.IGNORECASE)
+    return lambda line: folded(line) if line.isascii() else lowered(line.lower())
+
+def _walk_files(path, skip_dirs=frozenset()):
+    """
+    Yield a DirEntry for every file under 'path'; unreadable directories are skipped like os.walk.
+    Subdirectories named in 'skip_dirs' are not entered.
+    """
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    if e.name not in skip_dirs:
+                        yield from _walk_files(e.path, skip_dirs)
+                elif e.is_file():
+                    yield e
+    except OSError:
+        return
+
+def _collect_files(path, ext_tuple, skip_dirs):
+    return [e.path for e in _walk_files(path, skip_dirs) if ext_tuple is None or e.name.endswith(ext_tuple)]
+
+def _list_files(base_path, ext_tuple, skip_dirs=frozenset()):
+    """
+    Return the paths of the files under 'base_path' whose names end with one of
+    'ext_tuple' (every file when it is None), in the same order as _walk_files;
+    directories named in 'skip_dirs' are pruned.
+    Top-level subdirectories are walked on a thread pool: scandir and stat
+    release the GIL, so their syscalls overlap.
+    """
+    try:
+        with os.scandir(base_path) as it:
+            top = list(it)
+    except OSError:
+        return []
+    subdirs = [e for e in top if e.is_dir(follow_symlinks=False) and e.name not in skip_dirs]
+    if len(subdirs) < ENUM_PARALLEL_MIN_DIRS:
+        return _collect_files(base_path, ext_tuple, skip_dirs)
+    parts = []
+    with ThreadPoolExecutor(max_workers=min(ENUM_WORKERS, len(subdirs))) as ex:
+        for e in top:
+            if e.is_dir(follow_symlinks=False):
+                if e.name not in skip_dirs:
+                    parts.append(ex.submit(_collect_files, e.path, ext_tuple, skip_dirs))
+            elif e.is_file() and (ext_tuple is None or e.name.endswith(ext_tuple)):
+                parts.append(e.path)
+        file_list = []
+        for part in parts:
+            if isinstance(part, str):
+                file_list.append(part)
+            else:
+                file_list.extend(part.result())
+    return file_list
+
+# Non-ASCII letters that re.IGNORECASE matches to an ASCII one in str patterns;
+# this covers the two ("İ", "K") whose str.lower() contains an ASCII letter
+_FOLD_EXTRAS = {"i": ("\u0130", "\u0131"), "k": ("\u212a",), "s": ("\u017f",)}
+
+def _bytes_keyword_pattern(keyword, case_sensitive):
+    """
+    Compile the ASCII 'keyword' for searching raw UTF-8 bytes. Case-insensitive
+    patterns also accept the encoded non-ASCII letters that str matching folds
+    onto i, k and s, so no line the decoded check would accept is skipped.
+    """
+    if case_sensitive:
+        return re.compile(re.escape(keyword.encode("ascii")))
+    parts = []
+    for ch in keyword:
+        alts = [re.escape(ch.encode("ascii"))] + [re.escape(x.encode()) for x in _FOLD_EXTRAS.get(ch.lower(), ())]
+        parts.append(alts[0] if len(alts) == 1 else b"(?:" + b"|".join(alts) + b")")
+    return re.compile(b"".join(parts), re.IGNORECASE)
+
+def _iter_lines(file, keyword, case_sensitive, ignore_comments, skip_binary=False):
+    """
+    Yield (line_no, line) for the lines of 'file' that need the full check.
+    With skip_binary, a file with a NUL byte in its first 8 KiB is skipped.
+    A file that doesn't contain the keyword anywhere is rejected in one C call
+    before any per-line work. An ASCII keyword is looked for in the raw bytes,
+    and unless comment state has to be tracked only the lines containing the
+    keyword bytes are decoded.
+    """
+    if not keyword.isascii():
+        with open(file, "r", encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+        if skip_binary and "\x00" in text[:BINARY_SNIFF_BYTES]:
+            return
+        if not _compile_matcher(keyword, False, False, case_sensitive)(text):
+            return
+        yield from enumerate(text.split("\n"), start=1)
+        return
+    kw = _bytes_keyword_pattern(keyword, case_sensitive)
+    with open(file, "rb") as f:
+        if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+            # large file: search the page cache in place rather than copying it
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if skip_binary and b"\x00" in mm[:BINARY_SNIFF_BYTES]:
+                    return
+                if not kw.search(mm):
+                    return
+                yield from _iter_candidate_lines(_mmap_lines(mm), kw, ignore_comments)
+            return
+        data = f.read()
+    if skip_binary and b"\x00" in data[:BINARY_SNIFF_BYTES]:
+        return
+    if not kw.search(data):
+        return
+    # same line breaks as text mode's universal newlines
+    data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    yield from _iter_candidate_lines(data.split(b"\n"), kw, ignore_comments)
+
+def _mmap_lines(mm):
+    """Split a mapped file into lines with text mode's universal-newline rules."""
+    for raw_line in iter(mm.readline, b""):
+        if raw_line.endswith(b"\n"):
+            raw_line = raw_line[:-2] if raw_line.endswith(b"\r\n") else raw_line[:-1]
+        if b"\r" in raw_line:
+            yield from raw_line.split(b"\r")
+        else:
+            yield raw_line
+
+def _iter_candidate_lines(raw_lines, kw, ignore_comments):
+    for i, raw_line in enumerate(raw_lines, start=1):
+        if ignore_comments or kw.search(raw_line):
+            yield i, raw_line.decode("utf-8", errors="ignore")
+
+def _scan_one_file(args):
+    """
+    Pool worker: scan one file and return (file, [(file, line_no, line), ...]).
+    Takes and returns only picklable values so it can run in a child process.
+    """
+    file, keyword, exact_match, per_token, case_sensitive, ignore_comments, skip_binary = args
+    matches = []
+    line_matches = _compile_matcher(keyword, exact_match, per_token, case_sensitive)
+    ext = os.path.splitext(file)[1]
+    single_markers = SINGLE_LINE_MARKERS.get(ext, [])
+    multi_tokens = MULTI_COMMENT_TOKENS.get(ext, [])
+
+    inside_multiline = False
+    current_multi_end = None
+
+    try:
+        for i, original_line in _iter_lines(file, keyword, case_sensitive, ignore_comments, skip_binary):
+            processing_line = original_line
+            display_line = original_line
+
+            if ignore_comments:
+                # if inside multiline block, look for end
+                if inside_multiline:
+                    if current_multi_end and current_multi_end in processing_line:
+                        end_idx = processing_line.find(current_multi_end)
+                        processing_line = processing_line[end_idx + len(current_multi_end):]
+                        inside_multiline = False
+                        current_multi_end = None
+                    else:
+                        # whole line inside block comment -> skip
+                        continue
+
+                # remove inline multiline blocks or enter multiline mode
+                if multi_tokens:
+                    while True:
+                        earliest_start = -1
+                        chosen_start, chosen_end = None, None
+                        for s_tok, e_tok in multi_tokens:
+                            s_idx = processing_line.find(s_tok)
+                            if s_idx != -1 and (earliest_start == -1 or s_idx < earliest_start):
+                                earliest_start = s_idx
+                                chosen_start, chosen_end = s_tok, e_tok
+                        if earliest_start == -1:
+                            break
+                        e_idx = processing_line.find(chosen_end, earliest_start + len(chosen_start))
+                        if e_idx != -1:
+                            processing_line = processing_line[:earliest_start] + processing_line[e_idx + len(chosen_end):]
+                            continue
+                        else:
+                            processing_line = processing_line[:earliest_start]
+                            inside_multiline = True
+                            current_multi_end = chosen_end
+                            break
+
+                # remove inline single-line comment tails safely (marker not inside string)
+                if single_markers:
+                    marker_idx, marker = _first_unquoted_marker_index(processing_line, single_markers)
+                    if marker_idx != -1:
+                        processing_line = processing_line[:marker_idx]
+
+                # if remaining text empty or starts with marker -> skip
+                stripped_remaining = processing_line.strip()
+                if not stripped_remaining:
+                    continue
+                is_entire_comment = False
+                for m in single_markers:
+                    mrk_idx, mrk = _first_unquoted_marker_index(stripped_remaining, single_markers)
+                    if mrk_idx == 0:
+                        is_entire_comment = True
+                        break
+                if is_entire_comment:
+                    continue
+
+            # matching logic (compiled once per file; no lowercased copy of the line)
+            if line_matches(processing_line):
+                matches.append((file, i, display_line))
+    except Exception:
+        # skip unreadable files
+        pass
+    return file, matches
+
+def _report_progress(file, scanned_files, total_files, filename_var, progress_setter, progress_var, files_scanned_var):
+    if filename_var is not None and file is not None:
+        display_path = file if len(file) <= 80 else "..." + file[-80:]
+        filename_var.set(f"Scanning: {display_path}")
+    files_scanned_var.set(f"Scanned: {scanned_files}/{max(1, total_files)}")
+    progress_fraction = (scanned_files / max(1, total_files))
+    if progress_setter:
+        try:
+            progress_setter(progress_fraction)
+        except Exception:
+            progress_var.set(f"{progress_fraction*100:.1f}%")
+    else:
+        progress_var.set(f"{progress_fraction*100:.1f}%")
+
 def search_in_files(base_path, keyword, extensions, exact_match, per_token, case_sensitive,
                     ignore_comments, safeguard_limit, filename_var,
                     progress_setter, progress_var, count_var, files_scanned_var, total_files_var,
-                    stop_check=None, pause_check=None):
+                    stop_event=None, resume_event=None, skip_binary=True, skip_dirs=SKIP_DIRS):
     """
-    - stop_check: optional callable that returns True if search should stop immediately.
-    - pause_check: optional callable that returns True while the worker should pause (blocked).
-    All other behavior preserved.
+    - stop_event: optional threading.Event; once set, the search stops.
+    - resume_event: optional threading.Event; the worker blocks while it is clear.
+    - skip_binary: skip files with a NUL byte in their first 8 KiB.
+    - skip_dirs: directory names that are never descended into.
+    Files are scanned in a process pool; stop and pause are honoured between files.
     """
     results = []
-    file_list = []
-
-    for root, _, files in os.walk(base_path):
-        for file in files:
-            if extensions == ["*"] or any(file.endswith(ext) for ext in extensions):
-                file_list.append(os.path.join(root, file))
+    ext_tuple = None if extensions == ["*"] else tuple(extensions)
+    file_list = _list_files(base_path, ext_tuple, skip_dirs)
 
     total_files = len(file_list)
     total_files_var.set(f"Total Files: {total_files}")
     match_count = 0
     update_chunk = 50
-
-    search_keyword = keyword if case_sensitive else keyword.lower()
-    token_splitter = re.compile(r"\W+")
-
-    for idx, file in enumerate(file_list, start=1):
-        # check stop at file granularity
-        if stop_check and stop_check():
-            break
-
-        # handle pause: if pause_check returns True, block here until cleared or stopped
-        while pause_check and pause_check():
-            # still allow immediate termination while paused
-            if stop_check and stop_check():
+    scanned_files = 0
+    last_ui = 0.0
+
+    # results come back in file order; leaving the 'with' block on stop terminates the pool
+    tasks = ((file, keyword, exact_match, per_token, case_sensitive, ignore_comments, skip_binary) for file in file_list)
+    with multiprocessing.Pool(os.cpu_count()) as pool:
+        for idx, (file, matches) in enumerate(pool.imap(_scan_one_file, tasks, chunksize=32), start=1):
+            # handle pause: block without polling until resumed; a confirmed
+            # cancel sets stop_event before resume_event, so it's seen below
+            if resume_event is not None:
+                resume_event.wait()
+
+            if stop_event is not None and stop_event.is_set():
                 break
-            time.sleep(0.08)  # short sleep to be responsive
-
-        if stop_check and stop_check():
-            break
 
-        ext = os.path.splitext(file)[1]
-        single_markers = SINGLE_LINE_MARKERS.get(ext, [])
-        multi_tokens = MULTI_COMMENT_TOKENS.get(ext, [])
-
-        inside_multiline = False
-        current_multi_end = None
-
-        try:
-            with open(file, "r", encoding="utf-8", errors="ignore") as f:
-                lines = f.readlines()
-                for i, raw_line in enumerate(lines, start=1):
-                    # check cancellation mid-file
-                    if stop_check and stop_check():
-                        break
-
-                    # handle pause mid-file
-                    while pause_check and pause_check():
-                        if stop_check and stop_check():
-                            break
-                        time.sleep(0.08)
-                    if stop_check and stop_check():
-                        break
-
-                    original_line = raw_line.rstrip("\n")
-                    processing_line = original_line
-                    display_line = original_line
-
-                    # update current filename in UI
-                    if filename_var is not None:
-                        display_path = file if len(file) <= 80 else "..." + file[-80:]
-                        filename_var.set(f"Scanning: {display_path}")
-
-                    if ignore_comments:
-                        # if inside multiline block, look for end
-                        if inside_multiline:
-                            if current_multi_end and current_multi_end in processing_line:
-                                end_idx = processing_line.find(current_multi_end)
-                                processing_line = processing_line[end_idx + len(current_multi_end):]
-                                inside_multiline = False
-                                current_multi_end = None
-                            else:
-                                # whole line inside block comment -> skip
-                                continue
-
-                        # remove inline multiline blocks or enter multiline mode
-                        if multi_tokens:
-                            while True:
-                                earliest_start = -1
-                                chosen_start, chosen_end = None, None
-                                for s_tok, e_tok in multi_tokens:
-                                    s_idx = processing_line.find(s_tok)
-                                    if s_idx != -1 and (earliest_start == -1 or s_idx < earliest_start):
-                                        earliest_start = s_idx
-                                        chosen_start, chosen_end = s_tok, e_tok
-                                if earliest_start == -1:
-                                    break
-                                e_idx = processing_line.find(chosen_end, earliest_start + len(chosen_start))
-                                if e_idx != -1:
-                                    processing_line = processing_line[:earliest_start] + processing_line[e_idx + len(chosen_end):]
-                                    continue
-                                else:
-                                    processing_line = processing_line[:earliest_start]
-                                    inside_multiline = True
-                                    current_multi_end = chosen_end
-                                    break
-
-                        # remove inline single-line comment tails safely (marker not inside string)
-                        if single_markers:
-                            marker_idx, marker = _first_unquoted_marker_index(processing_line, single_markers)
-                            if marker_idx != -1:
-                                processing_line = processing_line[:marker_idx]
-
-                        # if remaining text empty or starts with marker -> skip
-                        stripped_remaining = processing_line.strip()
-                        if not stripped_remaining:
-                            continue
-                        is_entire_comment = False
-                        for m in single_markers:
-                            mrk_idx, mrk = _first_unquoted_marker_index(stripped_remaining, single_markers)
-                            if mrk_idx == 0:
-                                is_entire_comment = True
-                                break
-                        if is_entire_comment:
-                            continue
-
-                    # prepare for search
-                    search_line = processing_line if case_sensitive else processing_line.lower()
-
-                    # matching logic
-                    if per_token:
-                        tokens = token_splitter.split(search_line)
-                        match_found = (search_keyword in tokens)
-                    elif exact_match:
-                        match_found = (search_line.strip() == search_keyword)
-                    else:
-                        match_found = (search_keyword in search_line)
-
-                    if match_found:
-                        match_count += 1
-                        results.append((file, i, display_line))
-                        if match_count % update_chunk == 0:
-                            count_var.set(f"Found Keywords: {match_count}")
-
-                # end per-line loop
-                if stop_check and stop_check():
-                    break
-
-        except Exception:
-            # skip unreadable files
-            pass
-
-        # update per-file progress
-        files_scanned_var.set(f"Scanned: {idx}/{max(1, total_files)}")
-        progress_fraction = (idx / max(1, total_files))
-        if progress_setter:
-            try:
-                progress_setter(progress_fraction)
-            except Exception:
-                progress_var.set(f"{progress_fraction*100:.1f}%")
-        else:
-            progress_var.set(f"{progress_fraction*100:.1f}%")
-
-        # check cancellation between files
-        if stop_check and stop_check():
-            break
+            if matches:
+                previous_count = match_count
+                match_count += len(matches)
+                results.extend(matches)
+                if match_count // update_chunk != previous_count // update_chunk:
+                    count_var.set(f"Found Keywords: {match_count}")
+
+            # update filename and per-file progress, throttled to the display rate
+            # since every update schedules a repaint of the bar and labels
+            scanned_files = idx
+            now = time.monotonic()
+            if now - last_ui >= UI_REFRESH_INTERVAL:
+                last_ui = now
+                _report_progress(file, scanned_files, total_files, filename_var,
+                                 progress_setter, progress_var, files_scanned_var)
+
+            # check cancellation between files
+            if stop_event is not None and stop_event.is_set():
+                break
 
+    # the last throttled update may be stale; publish the final position
+    _report_progress(None, scanned_files, total_files, filename_var,
+                     progress_setter, progress_var, files_scanned_var)
     count_var.set(f"Found Keywords: {match_count}")
     return results
 
@@ -301,8 +507,12 @@ class SearchUtilityApp(ctk.CTk):
         self.minsize(1200,700)
 
         # state
-        self.stop_flag = False        # true => worker should stop
-        self.pause_flag = False       # true => worker should pause
+        self.stop_event = threading.Event()    # set => worker should stop
+        self.resume_event = threading.Event()  # clear => worker should pause
+        self.resume_event.set()
+        self.exporting = False        # true while an export thread is writing
+        self._ufiles_cache = (None, None)  # (results list, its sorted unique files)
+        self._tree_rows = None        # rows _populate_tree is currently inserting
         self.search_results = []
         self.match_count = 0
         self.files_scanned = 0
@@ -315,9 +525,20 @@ class SearchUtilityApp(ctk.CTk):
         self.current_file_text = tk.StringVar(value="")
         self.total_files_text = tk.StringVar(value="Total Files: 0")
 
+        # thread-safe stand-ins for the variables above, used by the search worker
+        self.progress_text_proxy = VarProxy(self, self.progress_text, interval_ms=120)
+        self.found_text_proxy = VarProxy(self, self.found_text, interval_ms=120)
+        self.files_scanned_proxy = VarProxy(self, self.files_scanned_text, interval_ms=120)
+        self.current_file_proxy = VarProxy(self, self.current_file_text, interval_ms=120)
+        self.total_files_proxy = VarProxy(self, self.total_files_text, interval_ms=120)
+
         # toast for cancellation/completion messages
         self.toast_text = tk.StringVar(value="")
+        # latest progress values from _safe_ui_update, applied by _drain_updates
+        self._pending_update = {}
+        self._update_lock = threading.Lock()
         self._build_ui()
+        self.after(UI_DRAIN_MS, self._drain_updates)
 
     def _build_ui(self):
         pad = 12
@@ -355,10 +576,12 @@ class SearchUtilityApp(ctk.CTk):
         self.exact_var = tk.BooleanVar(value=False)
         self.token_var = tk.BooleanVar(value=False)
         self.case_var = tk.BooleanVar(value=False)
+        self.skip_binary_var = tk.BooleanVar(value=True)
 
         ctk.CTkCheckBox(opts, text="Exact Match", variable=self.exact_var).grid(row=0, column=0, padx=10, pady=8, sticky="w")
         ctk.CTkCheckBox(opts, text="Per Token Match", variable=self.token_var).grid(row=0, column=1, padx=10, pady=8, sticky="w")
         ctk.CTkCheckBox(opts, text="Case Sensitive", variable=self.case_var).grid(row=0, column=2, padx=10, pady=8, sticky="w")
+        ctk.CTkCheckBox(opts, text="Skip Binary Files", variable=self.skip_binary_var).grid(row=0, column=3, padx=10, pady=8, sticky="w")
 
         ctk.CTkLabel(opts, text="Ignore in Comments:").grid(row=1, column=0, padx=10, pady=8, sticky="e")
         self.comment_filter_cb = ctk.CTkComboBox(opts, values=["Yes", "No"], width=120)
@@ -370,6 +593,11 @@ class SearchUtilityApp(ctk.CTk):
         self.safeguard_entry.insert(0, "5000")
         self.safeguard_entry.grid(row=1, column=3, padx=10, pady=8, sticky="w")
 
+        ctk.CTkLabel(opts, text="Skip Directories:").grid(row=2, column=0, padx=10, pady=8, sticky="e")
+        self.skip_dirs_entry = ctk.CTkEntry(opts, width=420)
+        self.skip_dirs_entry.insert(0, ",".join(sorted(SKIP_DIRS)))
+        self.skip_dirs_entry.grid(row=2, column=1, columnspan=3, padx=10, pady=8, sticky="w")
+
         btn_frame = ctk.CTkFrame(self, corner_radius=8)
         btn_frame.grid(row=2, column=0, padx=pad, pady=(0,pad), sticky="ew")
         btn_frame.grid_columnconfigure((0,1,2), weight=1, uniform="a")
@@ -428,10 +656,12 @@ class SearchUtilityApp(ctk.CTk):
         bottom_frame = ctk.CTkFrame(self, corner_radius=8)
         bottom_frame.grid(row=5, column=0, padx=pad, pady=(0,pad), sticky="ew")
         bottom_frame.grid_columnconfigure((0,1), weight=1)
-        ctk.CTkButton(bottom_frame, text="Export Excel", command=lambda: self._export("excel"),
-                      width=140, fg_color="#0D47A1").grid(row=0, column=0, padx=10, pady=12, sticky="w")
-        ctk.CTkButton(bottom_frame, text="Export CSV", command=lambda: self._export("csv"),
-                      width=140, fg_color="#2E7D32").grid(row=0, column=1, padx=10, pady=12, sticky="w")
+        self.export_xlsx_btn = ctk.CTkButton(bottom_frame, text="Export Excel", command=lambda: self._export("excel"),
+                                             width=140, fg_color="#0D47A1")
+        self.export_xlsx_btn.grid(row=0, column=0, padx=10, pady=12, sticky="w")
+        self.export_csv_btn = ctk.CTkButton(bottom_frame, text="Export CSV", command=lambda: self._export("csv"),
+                                            width=140, fg_color="#2E7D32")
+        self.export_csv_btn.grid(row=0, column=1, padx=10, pady=12, sticky="w")
 
     def _on_ext_change(self, value=None):
         """
@@ -455,15 +685,21 @@ class SearchUtilityApp(ctk.CTk):
             self.folder_entry.insert(0, folder)
 
     def start_search_thread(self):
+        params = self._read_search_params()
+        if params is None:
+            return
         # disable run, enable cancel, reset flags
         self.run_btn.configure(state="disabled")
         self.cancel_btn.configure(state="normal")
-        self.stop_flag = False
-        self.pause_flag = False
+        self.stop_event.clear()
+        self.resume_event.set()
         self.search_results = []
+        self._ufiles_cache = (None, None)
         self.match_count = 0
         self.files_scanned = 0
+        self.total_files = 0
         self.tree.delete(*self.tree.get_children())
+        self._tree_rows = None
         self.found_text.set("Found Keywords: 0")
         self.files_scanned_text.set("Scanned: 0/0")
         self.total_files_text.set("Total Files: 0")
@@ -473,19 +709,19 @@ class SearchUtilityApp(ctk.CTk):
         # hide any existing toast
         self.toast_text.set("")
         self.toast_label.grid_remove()
-        threading.Thread(target=self._search_worker, daemon=True).start()
+        threading.Thread(target=self._search_worker, args=params, daemon=True).start()
 
     def cancel_search(self):
         """
         New flow:
-        - Immediately pause worker by setting pause_flag True.
+        - Immediately pause worker by clearing resume_event.
         - Disable cancel button to prevent re-entry.
         - Show confirmation dialog (blocking main thread).
-        - If user confirms -> set stop_flag True and clear pause_flag (worker will wake & exit).
-        - If user declines -> clear pause_flag to resume.
+        - If user confirms -> set stop_event, then resume_event (worker will wake & exit).
+        - If user declines -> set resume_event to resume.
         """
         # Immediately pause the worker
-        self.pause_flag = True
+        self.resume_event.clear()
         # provide immediate UI feedback
         self.current_file_text.set("Pausing... awaiting confirmation")
         self.cancel_btn.configure(state="disabled")
@@ -494,21 +730,23 @@ class SearchUtilityApp(ctk.CTk):
         confirm = messagebox.askyesno("Confirm Cancel", "Are you sure you want to cancel the search?")
         if confirm:
             # user wants to cancel: instruct worker to stop
-            self.stop_flag = True
+            self.stop_event.set()
             # unpause so worker can exit promptly
-            self.pause_flag = False
+            self.resume_event.set()
             self.current_file_text.set("Cancelling...")
             # keep cancel btn disabled until worker finishes and resets
         else:
             # user chose not to cancel: resume worker
-            self.pause_flag = False
+            self.resume_event.set()
             self.current_file_text.set("Resuming search...")
             # re-enable cancel button
             self.cancel_btn.configure(state="normal")
 
     def clear_results(self):
         self.tree.delete(*self.tree.get_children())
+        self._tree_rows = None
         self.search_results = []
+        self._ufiles_cache = (None, None)
         self.match_count = 0
         self.files_scanned = 0
         self.total_files = 0
@@ -520,33 +758,85 @@ class SearchUtilityApp(ctk.CTk):
         self.progress_text.set("0.0%")
         self.run_btn.configure(state="normal")
         self.cancel_btn.configure(state="normal")
-        self.stop_flag = False
-        self.pause_flag = False
+        self.stop_event.clear()
+        self.resume_event.set()
         # hide toast if any
         self.toast_text.set("")
         self.toast_label.grid_remove()
 
+    def _populate_tree(self, rows, start=0):
+        """
+        Insert result rows into the tree on the Tk thread, TREE_INSERT_CHUNK at a
+        time; the next chunk is queued with after_idle so pending redraws and
+        input are handled between chunks. A newer search or a clear stops it.
+        """
+        if start == 0:
+            self._tree_rows = rows
+            self.tree.delete(*self.tree.get_children())
+        elif rows is not self._tree_rows:
+            return
+        end = min(start + TREE_INSERT_CHUNK, len(rows))
+        for idx in range(start, end):
+            fp, ln, txt = rows[idx]
+            # row numbers double as iids, sparing Tk its auto-id generation
+            self.tree.insert("", "end", iid=str(idx + 1), values=(idx + 1, fp, ln, txt))
+        if end < len(rows):
+            self.after_idle(self._populate_tree, rows, end)
+
     def _safe_ui_update(self, progress=None, files_scanned=None, found_count=None, current_file=None, total_files=None, final=False):
-        def _apply():
-            if progress is not None:
-                try:
-                    self.progress_bar.set(progress)
-                    self.progress_text.set(f"{progress*100:.1f}%")
-                except Exception:
-                    self.progress_text.set(f"{progress*100:.1f}%")
-            if files_scanned is not None:
-                self.files_scanned_text.set(f"Scanned: {files_scanned}/{self.total_files}")
-            if found_count is not None:
-                self.found_text.set(f"Found Keywords: {found_count}")
-            if current_file is not None:
-                self.current_file_text.set(current_file)
-            if total_files is not None:
-                self.total_files_text.set(f"Total Files: {total_files}")
-            if final:
-                self.current_file_text.set("Search completed.")
-                self.run_btn.configure(state="normal")
-                self.cancel_btn.configure(state="normal")
-        self.after(1, _apply)
+        # Safe from any thread: later values overwrite earlier ones in the
+        # pending dict, which _drain_updates applies at most 30 times a second.
+        changes = {k: v for k, v in (("progress", progress), ("files_scanned", files_scanned),
+                                     ("found_count", found_count), ("current_file", current_file),
+                                     ("total_files", total_files)) if v is not None}
+        if final:
+            changes["final"] = True
+        with self._update_lock:
+            self._pending_update.update(changes)
+        if final:
+            # terminal state must not wait for the next tick
+            if threading.current_thread() is threading.main_thread():
+                self._apply_pending_update()
+            else:
+                self.after(0, self._apply_pending_update)
+
+    def _drain_updates(self):
+        try:
+            self._apply_pending_update()
+        finally:
+            # one failed update must not stop progress display for the session
+            self.after(UI_DRAIN_MS, self._drain_updates)
+
+    def _apply_pending_update(self):
+        with self._update_lock:
+            update, self._pending_update = self._pending_update, {}
+        if not update:
+            return
+        progress = update.get("progress")
+        files_scanned = update.get("files_scanned")
+        found_count = update.get("found_count")
+        current_file = update.get("current_file")
+        total_files = update.get("total_files")
+        if total_files is not None:
+            self.total_files = total_files  # denominator of the "Scanned" label below
+        if progress is not None:
+            try:
+                self.progress_bar.set(progress)
+                self.progress_text.set(f"{progress*100:.1f}%")
+            except Exception:
+                self.progress_text.set(f"{progress*100:.1f}%")
+        if files_scanned is not None:
+            self.files_scanned_text.set(f"Scanned: {files_scanned}/{self.total_files}")
+        if found_count is not None:
+            self.found_text.set(f"Found Keywords: {found_count}")
+        if current_file is not None:
+            self.current_file_text.set(current_file)
+        if total_files is not None:
+            self.total_files_text.set(f"Total Files: {total_files}")
+        if update.get("final"):
+            self.current_file_text.set("Search completed.")
+            self.run_btn.configure(state="normal")
+            self.cancel_btn.configure(state="normal")
 
     def show_toast(self, message, duration_ms=3000):
         """Show a small transient label (toast) with message for duration_ms milliseconds."""
@@ -559,6 +849,8 @@ class SearchUtilityApp(ctk.CTk):
         if not self.search_results:
             messagebox.showwarning("No Results", "No results to export.")
             return
+        if self.exporting:
+            return  # one export at a time; the buttons are disabled meanwhile
         if fmt == "csv":
             file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files","*.csv")], title="Save CSV as...")
         else:
@@ -567,73 +859,96 @@ class SearchUtilityApp(ctk.CTk):
             return
 
         remove_dup = messagebox.askyesno("Remove duplicates", "Remove duplicate rows (unique file+line) in exported results?")
-        export_list = []
-        seen = set()
-        for fp, ln, txt in self.search_results:
-            key = (fp, ln, txt)
-            if remove_dup and key in seen:
-                continue
-            seen.add(key)
-            export_list.append((fp, ln, txt))
-
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # widgets are read here, on the Tk thread; the worker only touches plain data
+        keyword = self.keyword_entry.get().strip()
+        # search_results is replaced by each search, never mutated, so the
+        # worker can read it as-is and the list identifies the result set
+        results = self.search_results
+        cached_results, ufiles = self._ufiles_cache
+        if cached_results is not results:
+            ufiles = None  # computed by the worker
+        self._set_exporting(True)
+        threading.Thread(target=self._export_worker,
+                         args=(fmt, file_path, remove_dup, keyword, results, ufiles),
+                         daemon=True).start()
+
+    def _set_exporting(self, busy):
+        self.exporting = busy
+        state = "disabled" if busy else "normal"
+        self.export_xlsx_btn.configure(state=state)
+        self.export_csv_btn.configure(state=state)
+
+    def _export_worker(self, fmt, file_path, remove_dup, keyword, search_results, ufiles=None):
+        """Dedup and write the export file off the Tk thread, then report back via after()."""
+        out = error = None
+        try:
+            # the (file, line, text) result tuples are their own dedup keys, so the
+            # dict holds only references; without dedup the snapshot is used as-is
+            export_list = list(dict.fromkeys(search_results)) if remove_dup else search_results
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            if ufiles is None:
+                ufiles = sorted({r[0] for r in search_results})  # cached by _export_done
+            if fmt == "csv":
+                out = f"{file_path}_{timestamp}.csv"
+                # 1 MiB buffer; rows go to writerows as generators, so the
+                # C writer loops over them without a Python call per row
+                with open(out, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+                    w = csv.writer(f)
+                    w.writerow(["#", "File Path", "Line Number", "Line Content"])
+                    w.writerows((i, fp, ln, txt) for i, (fp, ln, txt) in enumerate(export_list, start=1))
+                    w.writerows([
+                        [],
+                        ["--- SUMMARY ---"],
+                        ["Search Keyword:", keyword],
+                        ["Total Matches:", len(search_results)],
+                        ["Unique Files Count:", len(ufiles)],
+                        ["Unique Files:"],
+                    ])
+                    w.writerows((uf,) for uf in ufiles)
+            else:
+                out = f"{file_path}_{timestamp}.xlsx"
+                _write_xlsx(out, export_list, keyword, len(search_results), ufiles)
+        except Exception as e:
+            error = e
+        finally:
+            self.after(0, self._export_done, fmt, out, error, search_results, ufiles)
+
+    def _export_done(self, fmt, out, error, search_results=None, ufiles=None):
+        self._set_exporting(False)
+        if ufiles is not None and search_results is self.search_results:
+            # reused when the same results are exported again (e.g. CSV, then Excel)
+            self._ufiles_cache = (search_results, ufiles)
+        if error is not None:
+            messagebox.showerror("Export Failed", f"Could not write export: {error}")
+            return
         if fmt == "csv":
-            out = f"{file_path}_{timestamp}.csv"
-            with open(out, "w", newline="", encoding="utf-8") as f:
-                w = csv.writer(f)
-                w.writerow(["#", "File Path", "Line Number", "Line Content"])
-                for i, (fp, ln, txt) in enumerate(export_list, start=1):
-                    w.writerow([i, fp, ln, txt])
-                w.writerow([])
-                w.writerow(["--- SUMMARY ---"])
-                w.writerow(["Search Keyword:", self.keyword_entry.get().strip()])
-                w.writerow(["Total Matches:", len(self.search_results)])
-                ufiles = sorted(set([r[0] for r in self.search_results]))
-                w.writerow(["Unique Files Count:", len(ufiles)])
-                w.writerow(["Unique Files:"])
-                for uf in ufiles:
-                    w.writerow([uf])
             messagebox.showinfo("Export Complete", f"CSV exported: {out}")
         else:
-            out = f"{file_path}_{timestamp}.xlsx"
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Results"
-            ws.append(["#", "File Path", "Line Number", "Line Content"])
-            for i, (fp, ln, txt) in enumerate(export_list, start=1):
-                ws.append([sanitize_excel_value(i), sanitize_excel_value(fp), sanitize_excel_value(ln), sanitize_excel_value(txt)])
-            s = wb.create_sheet(title="Summary")
-            s.append(["--- SUMMARY ---"])
-            s.append(["Search Keyword", self.keyword_entry.get().strip()])
-            s.append(["Total Matches", len(self.search_results)])
-            ufiles = sorted(set([r[0] for r in self.search_results]))
-            s.append(["Unique Files Count", len(ufiles)])
-            s.append([])
-            s.append(["Unique Files"])
-            for uf in ufiles:
-                s.append([sanitize_excel_value(uf)])
-            wb.save(out)
             messagebox.showinfo("Export Complete", f"Excel exported: {out}")
 
     # ---------------- worker that glues UI to search_in_files ----------------
-    def _search_worker(self):
+    def _read_search_params(self):
+        """
+        Read and validate the search form on the Tk thread. Returns the
+        _search_worker arguments, or None after warning about bad input.
+        """
         keyword = self.keyword_entry.get().strip()
         folder = self.folder_entry.get().strip()
         if not folder or not keyword:
             messagebox.showwarning("Input Error", "Please provide folder and keyword.")
-            self.run_btn.configure(state="normal")
-            return
+            return None
 
         ext_choice = self.extension_cb.get()
         if ext_choice == "All":
             extensions = ["*"]
         elif ext_choice == "Custom":
-            custom_ext = self.custom_ext_entry.get().strip()
-            if not custom_ext:
+            # "py" and ".py" both mean ".py"; empty items would match every file
+            extensions = [e if e.startswith(".") else "." + e
+                          for e in (e.strip() for e in self.custom_ext_entry.get().split(",")) if e]
+            if not extensions:
                 messagebox.showwarning("Input Error", "Enter at least one extension.")
-                self.run_btn.configure(state="normal")
-                return
-            extensions = [e.strip() for e in custom_ext.split(",")]
+                return None
         else:
             extensions = [ext_choice]
 
@@ -641,49 +956,55 @@ class SearchUtilityApp(ctk.CTk):
         token_flag = bool(self.token_var.get())
         case_flag = bool(self.case_var.get())
         ignore_comments_flag = True if self.comment_filter_cb.get() == "Yes" else False
+        skip_binary_flag = bool(self.skip_binary_var.get())
+        skip_dirs = frozenset(d.strip() for d in self.skip_dirs_entry.get().split(",") if d.strip())
         try:
             safeguard_limit_val = int(self.safeguard_entry.get())
         except Exception:
             safeguard_limit_val = 5000
+        return (folder, keyword, extensions, exact_flag, token_flag, case_flag,
+                ignore_comments_flag, skip_binary_flag, skip_dirs, safeguard_limit_val)
+
+    def _search_worker(self, folder, keyword, extensions, exact_flag, token_flag, case_flag,
+                       ignore_comments_flag, skip_binary_flag, skip_dirs, safeguard_limit_val):
+        # Runs off the Tk thread: widgets are only reached through the proxies,
+        # _safe_ui_update and after(); the form was read by _read_search_params
 
         # progress_setter callable
         def progress_setter(frac):
-            # update UI -- don't directly check stop_flag here
+            # update UI -- don't directly check stop_event here
             try:
-                self._safe_ui_update(progress=frac, files_scanned=self.files_scanned, found_count=self.match_count, current_file=self.current_file_text.get())
+                self._safe_ui_update(progress=frac, files_scanned=self.files_scanned, found_count=self.match_count)
             except Exception:
                 pass
 
-        # stop_check callable for immediate cancellation
-        def stop_check():
-            return self.stop_flag
-
-        # pause_check callable (returns True while paused)
-        def pause_check():
-            return self.pause_flag
-
         # call the search (blocking inside thread)
         results = search_in_files(
             folder, keyword, extensions, exact_flag, token_flag, case_flag,
-            ignore_comments_flag, safeguard_limit_val, self.current_file_text,
-            progress_setter, self.progress_text, self.found_text, self.files_scanned_text, self.total_files_text,
-            stop_check=stop_check, pause_check=pause_check
+            ignore_comments_flag, safeguard_limit_val, self.current_file_proxy,
+            progress_setter, self.progress_text_proxy, self.found_text_proxy, self.files_scanned_proxy, self.total_files_proxy,
+            stop_event=self.stop_event, resume_event=self.resume_event, skip_binary=skip_binary_flag, skip_dirs=skip_dirs
         )
+        self.after(0, self._finish_search, results, safeguard_limit_val)
+
+    def _finish_search(self, results, display_limit):
+        # Tk thread. Apply the proxies' last pending values first so they
+        # can't land after (and overwrite) the final status below.
+        for proxy in (self.current_file_proxy, self.progress_text_proxy, self.found_text_proxy,
+                      self.files_scanned_proxy, self.total_files_proxy):
+            proxy._flush()
 
         # store and display results (respect safeguard)
         self.search_results = results
-        self.tree.delete(*self.tree.get_children())
-        display_limit = safeguard_limit_val
-        for idx, row in enumerate(self.search_results[:display_limit], start=1):
-            fp, ln, txt = row
-            self.tree.insert("", "end", values=(idx, fp, ln, txt))
+        # the tree is filled in chunks by _populate_tree
+        self._populate_tree(self.search_results[:display_limit])
 
         if len(self.search_results) > display_limit:
             self.after(10, lambda: messagebox.showwarning("Safeguard Limit Reached",
                                                          f"{display_limit} results displayed in UI. Total matches: {len(self.search_results)}"))
 
         # final UI updates: show toast if cancelled, else normal completion
-        if self.stop_flag:
+        if self.stop_event.is_set():
             # show cancelled toast
             self._safe_ui_update(progress=1.0, files_scanned=len(self.search_results), found_count=len(self.search_results), current_file="Search cancelled.", total_files=len(self.search_results), final=True)
             # show transient toast
@@ -695,11 +1016,12 @@ class SearchUtilityApp(ctk.CTk):
         self.run_btn.configure(state="normal")
         self.cancel_btn.configure(state="normal")
         # reset flags after run
-        self.stop_flag = False
-        self.pause_flag = False
+        self.stop_event.clear()
+        self.resume_event.set()
 
 # ---------------------- Run App ----------------------
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # scan pool workers in frozen (PyInstaller) builds
     if not PYGMENTS_AVAILABLE:
         msg = ("Pygments package not installed. Comment filtering may be slightly less accurate.\nInstall: pip install pygments\nContinue anyway?")
         if not messagebox.askyesno("Pygments not found", msg):